@@ -0,0 +1,73 @@
+"""Add product snapshot to order_items
+
+Revision ID: 0a41f785a3eb
+Revises: a6613b9bf256
+Create Date: 2026-10-18 17:48:12.551093
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a41f785a3eb'
+down_revision: Union[str, None] = 'a6613b9bf256'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns():
+    return [
+        sa.Column('product_name', sa.String(), nullable=True),
+        sa.Column('product_slug', sa.String(), nullable=True),
+        sa.Column('image_url', sa.String(), nullable=True),
+        sa.Column('image_version', sa.String(length=16), nullable=True),
+        sa.Column('discount_percentage', sa.Float(), nullable=True),
+    ]
+
+
+def _image_version(image_url: str) -> str:
+    # Same hash as app.services.images.source_version
+    return hashlib.blake2b(image_url.encode(), digest_size=8).hexdigest()
+
+
+def upgrade() -> None:
+    for column in _columns():
+        op.add_column('order_items', column)
+
+    # Backfill from the products as they are now, the closest record we
+    # have of them at purchase time. Inline (data:) images are not copied.
+    # UPDATE ... FROM works on Postgres and SQLite 3.33+.
+    op.execute("""
+        UPDATE order_items SET
+            product_name = products.name,
+            product_slug = products.slug,
+            image_url = CASE WHEN products.image_url LIKE 'data:%' THEN NULL ELSE products.image_url END,
+            discount_percentage = products.discount_percentage
+        FROM products
+        WHERE products.id = order_items.product_id
+    """)
+
+    # The version is a hash the database can't compute; one product at a time
+    # keeps only a single (possibly large, inline) image in memory
+    bind = op.get_bind()
+    product_ids = bind.execute(sa.text("""
+        SELECT id FROM products
+        WHERE image_url IS NOT NULL AND id IN (SELECT product_id FROM order_items)
+    """)).scalars().all()
+    for product_id in product_ids:
+        image_url = bind.execute(
+            sa.text("SELECT image_url FROM products WHERE id = :id"), {"id": product_id}
+        ).scalar()
+        bind.execute(
+            sa.text("UPDATE order_items SET image_version = :version WHERE product_id = :id"),
+            {"version": _image_version(image_url), "id": product_id},
+        )
+
+
+def downgrade() -> None:
+    for column in reversed(_columns()):
+        op.drop_column('order_items', column.name)
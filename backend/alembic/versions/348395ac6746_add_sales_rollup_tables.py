@@ -0,0 +1,42 @@
+"""Add sales rollup tables
+
+Revision ID: 348395ac6746
+Revises: 84413c2d9564
+Create Date: 2026-10-18 16:20:51.377412
+
+Populate them from existing orders with scripts/backfill_sales_stats.py;
+the app keeps them in sync from then on.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '348395ac6746'
+down_revision: Union[str, None] = '84413c2d9564'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('sales_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'status')
+    )
+    op.create_table('product_sales_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.String(), nullable=False),
+    sa.Column('units', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'product_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('product_sales_daily')
+    op.drop_table('sales_daily')
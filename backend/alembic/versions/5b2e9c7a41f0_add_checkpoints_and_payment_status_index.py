@@ -0,0 +1,50 @@
+"""Add batch job checkpoints and the pending payments index
+
+Revision ID: 5b2e9c7a41f0
+Revises: d77c5543a17d
+Create Date: 2026-10-18 21:40:27.104953
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e9c7a41f0'
+down_revision: Union[str, None] = 'd77c5543a17d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('checkpoints',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('cursor', sa.String(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    columns = ['payment_status', 'created_at', 'id']
+    if op.get_bind().dialect.name == 'postgresql':
+        # See add_order_search_indexes: keep orders writable during the build
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'ix_orders_payment_status_created_at_id', 'orders', columns,
+                unique=False, postgresql_concurrently=True, if_not_exists=True,
+            )
+    else:
+        op.create_index('ix_orders_payment_status_created_at_id', 'orders', columns, unique=False)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index(
+                'ix_orders_payment_status_created_at_id', table_name='orders',
+                postgresql_concurrently=True, if_exists=True,
+            )
+    else:
+        op.drop_index('ix_orders_payment_status_created_at_id', table_name='orders')
+    op.drop_table('checkpoints')
@@ -0,0 +1,75 @@
+"""Add product full-text search index
+
+Revision ID: 88f3ce5121da
+Revises: e70b417f6c34
+Create Date: 2026-10-18 11:42:10.218034
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '88f3ce5121da'
+down_revision: Union[str, None] = 'e70b417f6c34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # Generated column keeps the vector in sync on every write; weights rank
+        # name over category over description.
+        op.execute("""
+            ALTER TABLE products ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') ||
+                setweight(to_tsvector('english'::regconfig, coalesce(category, '')), 'B') ||
+                setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C')
+            ) STORED
+        """)
+        op.execute("CREATE INDEX ix_products_search_vector ON products USING GIN (search_vector)")
+    elif dialect == 'sqlite':
+        op.execute("""
+            CREATE VIRTUAL TABLE products_fts USING fts5(
+                product_id UNINDEXED, name, description, category,
+                tokenize = 'porter unicode61'
+            )
+        """)
+        op.execute("""
+            INSERT INTO products_fts (product_id, name, description, category)
+            SELECT id, name, description, category FROM products
+        """)
+        op.execute("""
+            CREATE TRIGGER products_fts_ai AFTER INSERT ON products BEGIN
+                INSERT INTO products_fts (product_id, name, description, category)
+                VALUES (new.id, new.name, new.description, new.category);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER products_fts_ad AFTER DELETE ON products BEGIN
+                DELETE FROM products_fts WHERE product_id = old.id;
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER products_fts_au AFTER UPDATE OF id, name, description, category ON products BEGIN
+                DELETE FROM products_fts WHERE product_id = old.id;
+                INSERT INTO products_fts (product_id, name, description, category)
+                VALUES (new.id, new.name, new.description, new.category);
+            END
+        """)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_products_search_vector")
+        op.execute("ALTER TABLE products DROP COLUMN IF EXISTS search_vector")
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS products_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_ai")
+        op.execute("DROP TABLE IF EXISTS products_fts")
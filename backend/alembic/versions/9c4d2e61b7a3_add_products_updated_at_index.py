@@ -0,0 +1,41 @@
+"""Index products.updated_at for the catalog Last-Modified
+
+Revision ID: 9c4d2e61b7a3
+Revises: 5b2e9c7a41f0
+Create Date: 2026-10-19 09:12:44.518206
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4d2e61b7a3'
+down_revision: Union[str, None] = '5b2e9c7a41f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # See add_order_search_indexes: keep products writable during the build
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'ix_products_updated_at', 'products', ['updated_at'],
+                unique=False, postgresql_concurrently=True, if_not_exists=True,
+            )
+    else:
+        op.create_index('ix_products_updated_at', 'products', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index(
+                'ix_products_updated_at', table_name='products',
+                postgresql_concurrently=True, if_exists=True,
+            )
+    else:
+        op.drop_index('ix_products_updated_at', table_name='products')
@@ -0,0 +1,71 @@
+"""Add order search indexes
+
+Revision ID: a6613b9bf256
+Revises: 348395ac6746
+Create Date: 2026-10-18 17:05:39.882140
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6613b9bf256'
+down_revision: Union[str, None] = '348395ac6746'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must match services.orders.phone_digits for the planner to use it
+PHONE_DIGITS = "regexp_replace(phone, '[^0-9]', '', 'g')"
+
+TRIGRAM_INDEXES = [
+    ('ix_orders_customer_name_trgm', 'customer_name gin_trgm_ops'),
+    ('ix_orders_phone_digits_trgm', f'({PHONE_DIGITS}) gin_trgm_ops'),
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # pg_trgm is a trusted extension (PG 13+), so the database owner can
+        # create it. Builds without contrib lack it: search still works there,
+        # just without these two indexes.
+        has_trgm = bind.execute(sa.text(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )).scalar() is not None
+        if has_trgm:
+            op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        else:
+            logging.getLogger('alembic').warning("pg_trgm is not available; skipping trigram indexes on orders")
+        # CONCURRENTLY keeps orders writable while the indexes build; see
+        # add_foreign_key_and_filter_indexes for recovering from an interrupted build.
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'ix_orders_status_created_at_id', 'orders', ['status', 'created_at', 'id'],
+                unique=False, postgresql_concurrently=True, if_not_exists=True,
+            )
+            if has_trgm:
+                for name, expression in TRIGRAM_INDEXES:
+                    op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON orders USING gin ({expression})")
+    else:
+        op.create_index(
+            'ix_orders_status_created_at_id', 'orders', ['status', 'created_at', 'id'],
+            unique=False, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, _ in reversed(TRIGRAM_INDEXES):
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            op.drop_index(
+                'ix_orders_status_created_at_id', table_name='orders',
+                postgresql_concurrently=True, if_exists=True,
+            )
+    else:
+        op.drop_index('ix_orders_status_created_at_id', table_name='orders', if_exists=True)
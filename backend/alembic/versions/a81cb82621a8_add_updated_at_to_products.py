@@ -0,0 +1,31 @@
+"""Add updated_at to products
+
+Revision ID: a81cb82621a8
+Revises: 88f3ce5121da
+Create Date: 2026-10-18 12:05:31.640412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a81cb82621a8'
+down_revision: Union[str, None] = '88f3ce5121da'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        # SQLite cannot ADD COLUMN with a non-constant default; backfill instead
+        op.add_column('products', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+        op.execute("UPDATE products SET updated_at = CURRENT_TIMESTAMP")
+    else:
+        op.add_column('products', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('products', 'updated_at')
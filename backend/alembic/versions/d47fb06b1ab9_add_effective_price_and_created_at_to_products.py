@@ -0,0 +1,49 @@
+"""Add effective_price and created_at to products
+
+Revision ID: d47fb06b1ab9
+Revises: e88019e971fa
+Create Date: 2026-10-18 14:02:44.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd47fb06b1ab9'
+down_revision: Union[str, None] = 'e88019e971fa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+EFFECTIVE_PRICE = 'price * (1 - coalesce(discount_percentage, 0) / 100.0)'
+
+INDEXES = [
+    ('ix_products_is_deleted_effective_price', ['is_deleted', 'effective_price', 'id']),
+    ('ix_products_is_deleted_created_at', ['is_deleted', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        # SQLite can only ADD a VIRTUAL generated column (still indexable),
+        # and cannot ADD COLUMN with a non-constant default
+        op.add_column('products', sa.Column('effective_price', sa.Float(), sa.Computed(EFFECTIVE_PRICE, persisted=False), nullable=True))
+        op.add_column('products', sa.Column('created_at', sa.DateTime(timezone=True), nullable=True))
+        # Best guess for existing rows; updated_at is the closest we have
+        op.execute("UPDATE products SET created_at = coalesce(updated_at, CURRENT_TIMESTAMP)")
+    else:
+        op.add_column('products', sa.Column('effective_price', sa.Float(), sa.Computed(EFFECTIVE_PRICE, persisted=True), nullable=True))
+        op.add_column('products', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+        op.execute("UPDATE products SET created_at = coalesce(updated_at, created_at)")
+    for name, columns in INDEXES:
+        op.create_index(name, 'products', columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='products')
+    op.drop_column('products', 'created_at')
+    op.drop_column('products', 'effective_price')
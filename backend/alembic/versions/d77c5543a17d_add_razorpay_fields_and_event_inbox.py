@@ -0,0 +1,63 @@
+"""Add Razorpay fields to orders and the webhook event inbox
+
+Revision ID: d77c5543a17d
+Revises: 3d03d4108ade
+Create Date: 2026-10-18 19:05:12.730418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd77c5543a17d'
+down_revision: Union[str, None] = '3d03d4108ade'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable columns without defaults: no table rewrite on Postgres
+    op.add_column('orders', sa.Column('razorpay_order_id', sa.String(), nullable=True))
+    op.add_column('orders', sa.Column('razorpay_payment_id', sa.String(), nullable=True))
+    op.add_column('orders', sa.Column('payment_status', sa.String(), nullable=True))
+    op.create_table('razorpay_events',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('received_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_razorpay_events_processed_at_received_at', 'razorpay_events',
+        ['processed_at', 'received_at'], unique=False,
+    )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # See add_order_search_indexes: keep orders writable during the build
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'ix_orders_razorpay_order_id', 'orders', ['razorpay_order_id'],
+                unique=True, postgresql_concurrently=True, if_not_exists=True,
+            )
+    else:
+        op.create_index('ix_orders_razorpay_order_id', 'orders', ['razorpay_order_id'], unique=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index(
+                'ix_orders_razorpay_order_id', table_name='orders',
+                postgresql_concurrently=True, if_exists=True,
+            )
+    else:
+        op.drop_index('ix_orders_razorpay_order_id', table_name='orders')
+    op.drop_index('ix_razorpay_events_processed_at_received_at', table_name='razorpay_events')
+    op.drop_table('razorpay_events')
+    op.drop_column('orders', 'payment_status')
+    op.drop_column('orders', 'razorpay_payment_id')
+    op.drop_column('orders', 'razorpay_order_id')
@@ -0,0 +1,43 @@
+"""Add category_stats table
+
+Revision ID: e88019e971fa
+Revises: 82c8635ddad6
+Create Date: 2026-10-18 13:02:44.918305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e88019e971fa'
+down_revision: Union[str, None] = '82c8635ddad6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('category_stats',
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('product_count', sa.Integer(), nullable=False),
+    sa.Column('featured_count', sa.Integer(), nullable=False),
+    sa.Column('holiday_special_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('category')
+    )
+    # Backfill from the current catalog; the app keeps it in sync from here on
+    op.execute("""
+        INSERT INTO category_stats (category, product_count, featured_count, holiday_special_count)
+        SELECT category,
+               COUNT(*),
+               SUM(CASE WHEN is_featured THEN 1 ELSE 0 END),
+               SUM(CASE WHEN is_holiday_special THEN 1 ELSE 0 END)
+        FROM products
+        WHERE is_deleted = false AND category IS NOT NULL
+        GROUP BY category
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('category_stats')
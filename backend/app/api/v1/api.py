@@ -1,9 +1,14 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, products, orders, users
+from app.core.config import settings
+from app.api.v1.endpoints import auth, products, orders, users, storefront, analytics, payments
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(products.router, prefix="/products", tags=["products"])
 api_router.include_router(orders.router, prefix="/orders", tags=["orders"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
-# api_router.include_router(payments.router, prefix="/payments", tags=["payments"]) # Payments removed for COD only flow
+api_router.include_router(storefront.router, prefix="/storefront", tags=["storefront"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+# Payments were removed for the COD only flow; PAYMENTS_ENABLED brings them back
+if settings.PAYMENTS_ENABLED:
+    api_router.include_router(payments.router, prefix="/payments", tags=["payments"])
@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.api import deps
+from app.schemas.analytics import SalesSummary
+from app.services.sales_stats import sales_summary, today
+
+router = APIRouter()
+
+DEFAULT_DAYS = 30
+MAX_DAYS = 366 * 2
+
+@router.get("/sales", response_model=SalesSummary)
+def read_sales(
+    db: Session = Depends(deps.get_db),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    top: int = Query(10, ge=1, le=100),
+    current_user = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Sales dashboard (Admin only): revenue and orders per day, orders by
+    status, average order value and the top `top` products by units,
+    for the local days `start`..`end` inclusive (default: last 30 days).
+    Served from the sales rollups, not the orders table.
+    """
+    end = end or today()
+    start = start or end - timedelta(days=DEFAULT_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days >= MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {MAX_DAYS} days")
+    return sales_summary(db, start, end, top)
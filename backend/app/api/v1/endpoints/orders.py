@@ -1,89 +1,189 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from datetime import datetime
+from typing import Any, List, Optional, Union
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import desc, select
 from app.api import deps
-from app.models.order import Order, OrderItem, OrderStatus
-from app.models.product import Product
-from app.schemas.order import Order as OrderSchema, OrderCreate
+from app.core.pagination import datetime_key, decode_cursor, encode_cursor, keyset_after
+from app.core.serialization import fast_json
+from app.models.order import VALID_STATUSES, Order, OrderStatus
+from app.schemas.order import (
+    Order as OrderSchema,
+    OrderCreate,
+    OrderPage,
+    OrderStatusBulkUpdate,
+    OrderStatusResult,
+)
+from app.services.order_export import iter_orders_export
+from app.services.sales_stats import SalesDeltas
+from app.services import catalog, idempotency, notifications
+from app.services.orders import (
+    RELEASED_STATUSES,
+    InsufficientStock,
+    ProductNotFound,
+    build_order,
+    bulk_update_status,
+    filter_orders,
+    quantities,
+    release_stock,
+    reserve_stock,
+    with_items,
+)
 import json
+import re
 
 router = APIRouter()
 
-@router.get("/", response_model=List[OrderSchema])
+@router.get("/", response_model=Union[List[OrderSchema], OrderPage])
 def read_orders(
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    phone: Optional[str] = Query(None, max_length=32),
+    customer_name: Optional[str] = Query(None, min_length=3, max_length=100),
+    status: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
     current_user = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve orders.
     Admins see all orders (newest first).
     Users see their own orders.
+    Passing `cursor` (empty for the first page) switches to keyset
+    pagination on (created_at, id) and returns `{items, next_cursor}`.
+    Filters: `phone` (any 3+ digits of it), `customer_name` (any part,
+    case-insensitive), `status`, and `start` (inclusive) / `end`
+    (exclusive) on created_at.
     """
-    if current_user.role == "admin":
-        orders = db.query(Order).order_by(desc(Order.created_at)).offset(skip).limit(limit).all()
-    else:
-        orders = db.query(Order).filter(Order.user_id == current_user.id).order_by(desc(Order.created_at)).offset(skip).limit(limit).all()
-    return orders
+    if phone is not None and len(re.sub(r"\D", "", phone)) < 3:
+        raise HTTPException(status_code=400, detail="phone must contain at least 3 digits")
+    if status is not None and status not in VALID_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of {[s.value for s in OrderStatus]}")
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    # Read-only: plain rows rather than tracked ORM instances
+    stmt = select(Order.__table__)
+    if current_user.role != "admin":
+        stmt = stmt.where(Order.user_id == current_user.id)
+    stmt = filter_orders(
+        stmt,
+        db.get_bind().dialect.name,
+        phone=phone,
+        customer_name=customer_name,
+        status=status,
+        start=start,
+        end=end,
+    )
+
+    if cursor is None:
+        orders = db.execute(stmt.order_by(desc(Order.created_at)).offset(skip).limit(limit)).all()
+        return fast_json(List[OrderSchema], with_items(db, orders))
+
+    if cursor:
+        try:
+            created_at, order_id = decode_cursor(cursor, 2)
+            created_at = datetime_key(db, created_at)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(
+            keyset_after([Order.created_at, Order.id], [created_at, order_id], descending=True)
+        )
+    orders = db.execute(stmt.order_by(desc(Order.created_at), desc(Order.id)).limit(limit)).all()
+    next_cursor = None
+    if orders and len(orders) == limit:
+        next_cursor = encode_cursor([orders[-1].created_at, orders[-1].id])
+    return fast_json(OrderPage, {"items": with_items(db, orders), "next_cursor": next_cursor})
+
+@router.get("/export")
+def export_orders(
+    format: str = "csv",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Stream orders as CSV or NDJSON, one line per order item (Admin only).
+    `start` is inclusive and `end` exclusive; both are optional.
+    """
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'ndjson'")
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"orders-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        iter_orders_export(format, start, end),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 @router.post("/", response_model=OrderSchema)
 def create_order(
     *,
     db: Session = Depends(deps.get_db),
     order_in: OrderCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     current_user = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Create new COD order.
+    Retries sent with the same `Idempotency-Key` header get the first
+    response back instead of placing the order again.
     """
-    # Calculate total and verify stock
-    total_amount = 0.0
-    db_items = []
-    
-    for item in order_in.items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        if not product:
-            raise HTTPException(status_code=404, detail=f"Product {item.product_id} not found")
-        
-        # Check stock here if needed
-        # if not product.in_stock:
-        #    raise HTTPException(status_code=400, detail=f"Product {product.name} is out of stock")
+    if idempotency_key:
+        try:
+            stored = idempotency.claim(
+                db, current_user.id, idempotency_key, idempotency.fingerprint("orders", order_in)
+            )
+        except idempotency.KeyReused as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except idempotency.KeyInFlight as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        if stored:
+            return idempotency.replay(stored)
 
-        total_amount += product.price * item.quantity
-        db_items.append({
-            "product": product,
-            "quantity": item.quantity,
-            "price": product.price
-        })
-
-    order = Order(
-        user_id=current_user.id,
-        customer_name=order_in.customer_name,
-        phone=order_in.phone,
-        status=OrderStatus.PENDING.value, # NEW/PENDING
-        payment_method="COD",
-        total_amount=total_amount,
-        shipping_address=order_in.shipping_address,
-    )
-    db.add(order)
+    try:
+        order, touched = build_order(db, current_user.id, order_in, payment_method="COD")
+    except ProductNotFound as e:
+        db.rollback()
+        raise HTTPException(status_code=404, detail=str(e))
+    except InsufficientStock as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    # Serialize while the flushed order and items are still loaded;
+    # commit expires them and would cost two more SELECTs
+    response = fast_json(OrderSchema, order)
+    if idempotency_key:
+        idempotency.complete(db, current_user.id, idempotency_key, response)
+    notifications.queue_order_confirmation(db, order.id)
     db.commit()
-    db.refresh(order)
+    catalog.invalidate_products(touched)
+    return response
 
-    # Create Order Items
-    for item_data in db_items:
-        order_item = OrderItem(
-            order_id=order.id,
-            product_id=item_data["product"].id,
-            quantity=item_data["quantity"],
-            price_at_purchase=item_data["price"]
-        )
-        db.add(order_item)
-    
+@router.patch("/status", response_model=List[OrderStatusResult])
+def update_order_statuses(
+    *,
+    db: Session = Depends(deps.get_db),
+    update_in: OrderStatusBulkUpdate,
+    current_user = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Move many orders to one status (Admin only), e.g. marking the day's
+    parcels shipped. Only forward transitions are allowed (see
+    services.orders.ALLOWED_TRANSITIONS); each order gets a result of
+    updated, unchanged, invalid_transition or not_found.
+    """
+    if update_in.status not in VALID_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of {[s.value for s in OrderStatus]}")
+    results, touched = bulk_update_status(db, update_in.order_ids, update_in.status)
     db.commit()
-    db.refresh(order)
-    return order
+    catalog.invalidate_products(touched)
+    return fast_json(List[OrderStatusResult], results)
 
 @router.patch("/{order_id}/status", response_model=OrderSchema)
 def update_order_status(
@@ -96,16 +196,38 @@ def update_order_status(
     """
     Update order status (Admin only).
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = (
+        db.query(Order)
+        .options(selectinload(Order.items))
+        .filter(Order.id == order_id)
+        .first()
+    )
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    # Simple validation using OrderStatus enum values
-    valid_statuses = [s.value for s in OrderStatus]
-    if status not in valid_statuses:
-         raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of {valid_statuses}")
+    if status not in VALID_STATUSES:
+         raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of {[s.value for s in OrderStatus]}")
+
+    # Cancelling / failing an order gives its stock back; reviving one
+    # takes it again (409 if it has sold out in the meantime)
+    touched = {}
+    held = quantities(order.items)
+    if status in RELEASED_STATUSES and order.status not in RELEASED_STATUSES:
+        touched = release_stock(db, held)
+    elif order.status in RELEASED_STATUSES and status not in RELEASED_STATUSES:
+        try:
+            touched = reserve_stock(db, held)
+        except InsufficientStock as e:
+            db.rollback()
+            raise HTTPException(status_code=409, detail=str(e))
 
+    sales = SalesDeltas()
+    sales.remove(order, order.items)
     order.status = status
+    sales.add(order, order.items)
+    sales.apply(db)
+    # Serialize before commit expires the order and its eagerly loaded items
+    response = fast_json(OrderSchema, order)
     db.commit()
-    db.refresh(order)
-    return order
+    catalog.invalidate_products(touched)
+    return response
@@ -1,143 +1,137 @@
-import razorpay
 from fastapi import APIRouter, Depends, HTTPException, Request, Header
+from sqlalchemy import update
 from sqlalchemy.orm import Session
-from typing import Any
+from typing import Any, Optional
 import json
-import uuid
 
 from app.api import deps
 from app.core.config import settings
-from app.models.order import Order, OrderItem, OrderStatus
-from app.models.product import Product
+from app.models.order import Order, OrderStatus
 from app.schemas.order import OrderCreate
+from app.core.serialization import JSONBytesResponse
+from app.services import catalog, idempotency, payment_events
+from app.services.orders import InsufficientStock, ProductNotFound, build_order, bulk_update_status
+from app.services.razorpay_gateway import GatewayError, GatewayUnavailable, gateway, verify_webhook_signature
 
 router = APIRouter()
 
-# Initialize Razorpay Client
-client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
-
 @router.post("/create-order")
 def create_payment_order(
     *,
     db: Session = Depends(deps.get_db),
     order_in: OrderCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     current_user = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Create a new order and initiate Razorpay payment.
+    Retries sent with the same `Idempotency-Key` header get the first
+    response back instead of creating another order and Razorpay order.
     """
-    # 1. Calculate Amount & Verify Products
-    total_amount = 0.0
-    db_items = []
-    
-    for item in order_in.items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        if not product:
-            raise HTTPException(status_code=404, detail=f"Product {item.product_id} not found")
-        
-        # Check stock logic here if needed
-        
-        total_amount += product.price * item.quantity
-        db_items.append({
-            "product": product,
-            "quantity": item.quantity,
-            "price": product.price
-        })
-
-    # 2. Create DB Order (Pending)
-    order = Order(
-        user_id=current_user.id,
-        status=OrderStatus.PENDING.value,
-        total_amount=total_amount,
-        shipping_address=order_in.shipping_address,
-        payment_status="pending"
-    )
-    db.add(order)
-    db.commit()
-    db.refresh(order)
-
-    # 3. Create Order Items
-    for item_data in db_items:
-        order_item = OrderItem(
-            order_id=order.id,
-            product_id=item_data["product"].id,
-            quantity=item_data["quantity"],
-            price_at_purchase=item_data["price"]
+    # current_user expires with each commit below; keep its id
+    user_id = current_user.id
+
+    # 0. Replay (or wait for) an earlier attempt with the same key
+    if idempotency_key:
+        try:
+            stored = idempotency.claim(
+                db, user_id, idempotency_key, idempotency.fingerprint("payments", order_in)
+            )
+        except idempotency.KeyReused as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except idempotency.KeyInFlight as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        if stored:
+            return idempotency.replay(stored)
+
+    # While Razorpay is known to be down, don't reserve stock for an
+    # order that would only be failed again
+    if not gateway.breaker.available:
+        if idempotency_key:
+            idempotency.release(db, user_id, idempotency_key)
+            db.commit()
+        raise HTTPException(status_code=503, detail="Razorpay Error: Razorpay is unavailable (circuit open)")
+
+    # 1. Price the cart and create the DB order (pending) in one transaction
+    try:
+        order, touched = build_order(
+            db, user_id, order_in, payment_method="Razorpay", payment_status="pending"
         )
-        db.add(order_item)
+    except ProductNotFound as e:
+        db.rollback()
+        raise HTTPException(status_code=404, detail=str(e))
+    except InsufficientStock as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    order_id, total_amount = order.id, order.total_amount
     db.commit()
+    catalog.invalidate_products(touched)
+
+    # 2. Create Razorpay Order
+    # The commit gave the session's connection back to the pool and
+    # nothing touches the database again until Razorpay answers, so a
+    # slow call holds no connection. Amount is in paisa (cents)
+    amount_in_paisa = int(round(total_amount * 100))
 
-    # 4. Create Razorpay Order
-    # Amount is in paisa (cents)
-    amount_in_paisa = int(total_amount * 100)
-    
     try:
-        razorpay_order = client.order.create({
-            "amount": amount_in_paisa,
-            "currency": "INR",
-            "receipt": order.id,
-            "payment_capture": 1 # Auto capture
-        })
+        razorpay_order = gateway.create_order(amount_in_paisa, "INR", order_id)
     except Exception as e:
-        # If Razorpay fails, maybe mark order as failed or delete it?
-        # For now, just raise
-        raise HTTPException(status_code=500, detail=f"Razorpay Error: {str(e)}")
+        # Whatever went wrong, the order can never be paid: fail it and
+        # give its stock back
+        _, touched = bulk_update_status(db, [order_id], OrderStatus.FAILED.value)
+        db.execute(update(Order.__table__).where(Order.id == order_id).values(payment_status="failed"))
+        if idempotency_key:
+            # Let a retry start over with a fresh order
+            idempotency.release(db, user_id, idempotency_key)
+        db.commit()
+        catalog.invalidate_products(touched)
+        if not isinstance(e, GatewayError):
+            raise
+        status_code = 503 if isinstance(e, GatewayUnavailable) else 502
+        raise HTTPException(status_code=status_code, detail=f"Razorpay Error: {str(e)}")
 
-    # 5. Update Order with Razorpay Order ID
-    order.razorpay_order_id = razorpay_order['id']
-    db.commit()
-
-    return {
-        "order_id": order.id,
+    # 3. Update Order with Razorpay Order ID
+    db.execute(
+        update(Order.__table__).where(Order.id == order_id).values(razorpay_order_id=razorpay_order['id'])
+    )
+    response = JSONBytesResponse(content=json.dumps({
+        "order_id": order_id,
         "razorpay_order_id": razorpay_order['id'],
         "amount": total_amount,
         "currency": "INR",
         "key_id": settings.RAZORPAY_KEY_ID
-    }
+    }).encode())
+    if idempotency_key:
+        idempotency.complete(db, user_id, idempotency_key, response)
+    db.commit()
+
+    return response
+
+
+async def raw_body(request: Request) -> bytes:
+    return await request.body()
 
 
 @router.post("/webhook")
-async def razorpay_webhook(
-    request: Request,
+def razorpay_webhook(
+    body: bytes = Depends(raw_body),
     db: Session = Depends(deps.get_db),
-    x_razorpay_signature: str = Header(None)
+    x_razorpay_signature: str = Header(None),
+    x_razorpay_event_id: Optional[str] = Header(None, max_length=255),
 ):
     """
-    Handle Razorpay Webhooks (payment.captured, order.paid)
+    Handle Razorpay Webhooks (payment.captured, order.paid).
+    A verified delivery is stored in the event inbox, once per event id,
+    and acknowledged straight away; a background job applies it (see
+    services/payment_events).
     """
     if not x_razorpay_signature:
         raise HTTPException(status_code=400, detail="Missing Signature")
 
-    body_bytes = await request.body()
-    body_str = body_bytes.decode('utf-8')
-
     # Verify Signature
-    try:
-        client.utility.verify_webhook_signature(
-            body_str,
-            x_razorpay_signature,
-            settings.RAZORPAY_WEBHOOK_SECRET
-        )
-    except Exception as e:
+    if not verify_webhook_signature(body, x_razorpay_signature):
         raise HTTPException(status_code=400, detail="Invalid Signature")
 
-    event = json.loads(body_str)
-    
-    # Handle 'payment.captured' or 'order.paid'
-    if event['event'] == 'payment.captured':
-        payment_entity = event['payload']['payment']['entity']
-        razorpay_order_id = payment_entity['order_id']
-        razorpay_payment_id = payment_entity['id']
-        
-        # Find Order
-        order = db.query(Order).filter(Order.razorpay_order_id == razorpay_order_id).first()
-        if order:
-            order.status = OrderStatus.PAID.value
-            order.payment_status = "captured"
-            order.razorpay_payment_id = razorpay_payment_id
-            db.commit()
-            print(f"Order {order.id} marked as PAID via webhook")
-        else:
-            print(f"Order not found for Razorpay Order ID: {razorpay_order_id}")
-
+    payment_events.record(db, x_razorpay_event_id, body)
+    db.commit()
     return {"status": "ok"}
@@ -1,9 +1,15 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Body
+from typing import Any, List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Body, File, Query, Request, Response, UploadFile
 from sqlalchemy.orm import Session
 from app.api import deps
+from app.core.http_cache import cache_control, conditional_response, etag_matches
 from app.models.product import Product
-from app.schemas.product import Product as ProductSchema, ProductCreate, ProductUpdate
+from app.schemas.product import Product as ProductSchema, ProductCreate, ProductPage, ProductUpdate
+from app.schemas.category import CategoryFacet
+from app.services import catalog
+from app.services.search import search_products, search_terms
+from app.services import images, product_import
+from app.services.category_stats import FacetDeltas, facet_of, list_facets
 import uuid
 import re
 
@@ -15,31 +21,139 @@ def create_slug(name: str) -> str:
     slug = re.sub(r'[\s-]+', '-', slug)
     return slug
 
-@router.get("/", response_model=List[ProductSchema])
+@router.get("/", response_model=Union[List[ProductSchema], ProductPage])
 def read_products(
+    request: Request,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    category: Optional[str] = None
+    category: Optional[str] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Retrieve products.
+    `min_price` / `max_price` bound the price after discount; `sort` is
+    one of price_asc, price_desc or newest.
+    Passing `cursor` (empty for the first page) switches to keyset
+    pagination and returns `{items, next_cursor}` instead of a list.
+    Pages are served from the in-process catalog cache when possible and
+    honour If-None-Match / If-Modified-Since.
     """
-    query = db.query(Product).filter(Product.is_deleted == False)
-    if category:
-        query = query.filter(Product.category == category)
-    products = query.offset(skip).limit(limit).all()
-    return products
+    if sort not in catalog.SORTS:
+        raise HTTPException(status_code=400, detail="sort must be one of price_asc, price_desc, newest")
+    filters = catalog.ProductFilters(category, min_price, max_price, sort)
+    key = catalog.list_key(filters, skip, limit, cursor)
+    payload = catalog.product_cache.get(key)
+    if payload is None:
+        if cursor is not None:
+            try:
+                products = catalog.query_product_keyset(db, filters, cursor, limit)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            payload = catalog.serialize_product_page(products, limit, sort, catalog.category_key(category))
+        else:
+            products = catalog.query_product_page(db, filters, skip, limit)
+            payload = catalog.serialize_products(products, catalog.category_key(category))
+        catalog.product_cache.set(key, payload)
+    return conditional_response(request, payload)
+
+@router.get("/search", response_model=List[ProductSchema])
+def search_products_endpoint(
+    request: Request,
+    db: Session = Depends(deps.get_db),
+    q: str = "",
+    skip: int = 0,
+    limit: int = 20,
+) -> Any:
+    """
+    Full-text product search over name, description and category,
+    best matches first. Deleted products are never returned.
+    """
+    key = ("search", tuple(search_terms(q)), skip, limit)
+    payload = catalog.product_cache.get(key)
+    if payload is None:
+        payload = catalog.serialize_products(search_products(db, q, skip, limit), "search")
+        catalog.product_cache.set(key, payload)
+    return conditional_response(request, payload)
+
+@router.get("/categories", response_model=List[CategoryFacet])
+def read_categories(
+    request: Request,
+    db: Session = Depends(deps.get_db),
+) -> Any:
+    """
+    Categories with their live product, featured and holiday-special
+    counts, read from the maintained category_stats summary.
+    """
+    payload = catalog.product_cache.get(("facets",))
+    if payload is None:
+        payload = catalog.serialize_facets(list_facets(db))
+        catalog.product_cache.set(("facets",), payload)
+    return conditional_response(request, payload)
+
+@router.get("/cache/stats")
+def read_product_cache_stats(
+    current_user = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Catalog cache counters (Admin only), used to size the cache.
+    """
+    return catalog.product_cache.stats()
+
+@router.post("/bulk")
+def bulk_products(
+    *,
+    db: Session = Depends(deps.get_db),
+    file: UploadFile = File(...),
+    action: str = "upsert",
+    format: Optional[str] = None,
+    current_user = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Bulk upsert (keyed by slug) or soft-delete products from a CSV or
+    NDJSON upload (Admin only). Rows are written in batched transactions;
+    bad rows are reported per line and do not abort their batch.
+    """
+    if action not in ("upsert", "delete"):
+        raise HTTPException(status_code=400, detail="action must be 'upsert' or 'delete'")
+    if not format:
+        filename = (file.filename or "").lower()
+        format = "csv" if filename.endswith(".csv") or file.content_type == "text/csv" else "ndjson"
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'ndjson'")
+
+    rows = product_import.iter_rows(file.file, format)
+    try:
+        if action == "delete":
+            report = product_import.soft_delete_products(db, rows)
+        else:
+            report = product_import.import_products(db, rows, create_slug)
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Upload must be UTF-8 encoded")
+    finally:
+        # Partial imports still changed the catalog
+        catalog.product_cache.clear()
+    report["action"] = action
+    return report
 
 @router.get("/{slug}", response_model=ProductSchema)
 def read_product_by_slug(
     *,
+    request: Request,
     db: Session = Depends(deps.get_db),
     slug: str,
 ) -> Any:
     """
     Get product by slug.
     """
+    payload = catalog.product_cache.get_first((("slug", slug), ("id", slug)))
+    if payload is not None:
+        return conditional_response(request, payload)
+
     product = db.query(Product).filter(Product.slug == slug).first()
     if not product:
         # Try ID if not slug, for flexibility
@@ -47,7 +161,59 @@ def read_product_by_slug(
     
     if not product or product.is_deleted:
         raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    return conditional_response(request, catalog.cache_product_detail(product))
+
+@router.get("/{slug}/image")
+def read_product_image(
+    *,
+    request: Request,
+    db: Session = Depends(deps.get_db),
+    slug: str,
+    w: int = Query(640, ge=1, le=4000),
+    format: Optional[str] = None,
+    v: Optional[str] = None,
+) -> Any:
+    """
+    Product image downscaled to at most `w` pixels wide (snapped up to a
+    fixed set of widths) as WebP or JPEG. Without `format`, WebP is sent
+    to clients that accept it. Variants are rendered once and kept in an
+    on-disk LRU cache; pass the product's `image_version` as `v` to get
+    an immutable, year-long cacheable response. Images of deleted
+    products are only served at their current `v`, which is what order
+    item snapshots link to.
+    """
+    if format is None:
+        format = "webp" if "image/webp" in request.headers.get("accept", "") else "jpeg"
+    if format not in images.FORMATS:
+        raise HTTPException(status_code=400, detail="format must be 'webp' or 'jpeg'")
+
+    product = db.query(Product.image_url, Product.is_deleted).filter(Product.slug == slug).first()
+    if not product:
+        product = db.query(Product.image_url, Product.is_deleted).filter(Product.id == slug).first()
+    if not product or not product.image_url:
+        raise HTTPException(status_code=404, detail="Product image not found")
+
+    width = images.snap_width(w)
+    version = images.source_version(product.image_url)
+    if product.is_deleted and v != version:
+        raise HTTPException(status_code=404, detail="Product image not found")
+    headers = {
+        "ETag": f'"{images.variant_key(version, width, format)}"',
+        "Vary": "Accept",
+        "Cache-Control": "public, max-age=31536000, immutable" if v == version else cache_control(),
+    }
+    if etag_matches(request.headers.get("if-none-match", ""), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        data = images.get_variant(product.image_url, width, format)
+    except images.ImageSourceError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except images.ResizeTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Product image could not be decoded")
+    return Response(content=data, media_type=images.FORMATS[format][1], headers=headers)
 
 @router.post("/", response_model=ProductSchema)
 def create_product(
@@ -71,19 +237,14 @@ def create_product(
             detail="The product with this slug already exists",
         )
 
-    product = Product(
-        name=product_in.name,
-        slug=slug,
-        description=product_in.description,
-        price=product_in.price,
-        image_url=product_in.image_url,
-        category=product_in.category,
-        stock=product_in.stock,
-        is_featured=product_in.is_featured,
-    )
+    product = Product(slug=slug, **product_in.model_dump(exclude={"slug"}))
     db.add(product)
+    deltas = FacetDeltas()
+    deltas.add(facet_of(product))
+    deltas.apply(db)
     db.commit()
     db.refresh(product)
+    catalog.invalidate_product(product.id, product.slug)
     return product
 
 @router.put("/{slug}", response_model=ProductSchema)
@@ -105,13 +266,19 @@ def update_product(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
         
+    old_slug = product.slug
+    deltas = FacetDeltas()
+    deltas.remove(facet_of(product))
     update_data = product_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(product, field, value)
+    deltas.add(facet_of(product))
 
     db.add(product)
+    deltas.apply(db)
     db.commit()
     db.refresh(product)
+    catalog.invalidate_product(product.id, old_slug, product.slug)
     return product
 
 from sqlalchemy.exc import IntegrityError
@@ -137,13 +304,18 @@ def delete_product(
     import time
     
     # Mark as deleted
+    deltas = FacetDeltas()
+    deltas.remove(facet_of(product))
     product.is_deleted = True
     
     # Rename slug to free it up for future use (e.g. "necklace-123" -> "necklace-123-deleted-{timestamp}")
     # This prevents unique constraint errors if user creates a new product with same name
+    old_slug = product.slug
     product.slug = f"{product.slug}-deleted-{int(time.time())}"
     
     db.add(product)
+    deltas.apply(db)
     db.commit()
+    catalog.invalidate_product(product.id, old_slug)
     
     return product
@@ -0,0 +1,26 @@
+from typing import Any
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
+from app.api import deps
+from app.core.http_cache import conditional_response
+from app.schemas.storefront import HomePage
+from app.services import catalog
+from app.services.storefront import HOME_KEY, build_home
+
+router = APIRouter()
+
+@router.get("/home", response_model=HomePage)
+def read_home(
+    request: Request,
+    db: Session = Depends(deps.get_db),
+) -> Any:
+    """
+    Everything the home page renders (featured, holiday specials and
+    per-category rows) in a single cached response. Any product write
+    evicts it along with the other catalog listings.
+    """
+    payload = catalog.product_cache.get(HOME_KEY)
+    if payload is None:
+        payload = build_home(db)
+        catalog.product_cache.set(HOME_KEY, payload)
+    return conditional_response(request, payload)
@@ -1,13 +1,16 @@
-from typing import Any, List
+from typing import Any, List, Optional, Union
 from fastapi import APIRouter, Body, Depends, HTTPException
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.core.config import settings
+from app.core.pagination import datetime_key, decode_cursor, encode_cursor, keyset_after
+from app.core.serialization import fast_json
 from app.models.user import User
 from app.models.address import Address
 from app.schemas.user import User as UserSchema, UserUpdate
-from app.schemas.address import Address as AddressSchema, AddressCreate, AddressUpdate
+from app.schemas.address import Address as AddressSchema, AddressCreate, AddressPage, AddressUpdate
 
 router = APIRouter()
 
@@ -45,17 +48,38 @@ def update_user_me(
 
 # Address Endpoints
 
-@router.get("/me/addresses", response_model=List[AddressSchema])
+@router.get("/me/addresses", response_model=Union[List[AddressSchema], AddressPage])
 def read_user_addresses(
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_active_user),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Retrieve current user's addresses.
+    Passing `cursor` (empty for the first page) switches to keyset
+    pagination on (created_at, id) and returns `{items, next_cursor}`.
     """
-    return db.query(Address).filter(Address.user_id == current_user.id).offset(skip).limit(limit).all()
+    stmt = select(Address.__table__).where(Address.user_id == current_user.id)
+    if cursor is None:
+        addresses = db.execute(stmt.offset(skip).limit(limit)).all()
+        return fast_json(List[AddressSchema], addresses)
+
+    if cursor:
+        try:
+            created_at, address_id = decode_cursor(cursor, 2)
+            created_at = datetime_key(db, created_at)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(
+            keyset_after([Address.created_at, Address.id], [created_at, address_id])
+        )
+    addresses = db.execute(stmt.order_by(Address.created_at, Address.id).limit(limit)).all()
+    next_cursor = None
+    if addresses and len(addresses) == limit:
+        next_cursor = encode_cursor([addresses[-1].created_at, addresses[-1].id])
+    return fast_json(AddressPage, {"items": addresses, "next_cursor": next_cursor})
 
 @router.post("/me/addresses", response_model=AddressSchema)
 def create_user_address(
@@ -36,10 +36,76 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 11520
 
-    # Razorpay (unused for now)
+    # Product catalog cache (in-process, per worker)
+    PRODUCT_CACHE_MAXSIZE: int = 2048
+    PRODUCT_CACHE_TTL_SECONDS: int = 300
+    PRODUCT_CACHE_WARM_ON_STARTUP: bool = True
+
+    # HTTP caching of public catalog responses (browsers / CDN)
+    CATALOG_CACHE_MAX_AGE: int = 60
+    CATALOG_CACHE_S_MAXAGE: int = 300
+    CATALOG_CACHE_STALE_WHILE_REVALIDATE: int = 600
+
+    # Resized product image variants (on-disk LRU, per host)
+    IMAGE_CACHE_DIR: str = "/tmp/jewele-image-cache"
+    IMAGE_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    IMAGE_RESIZE_WORKERS: int = 2
+    IMAGE_MAX_SOURCE_BYTES: int = 15 * 1024 * 1024
+    # Prefix for image_url values that are relative paths
+    IMAGE_ORIGIN_BASE_URL: str = ""
+
+    # Idempotency-Key replay for order / payment creation
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 24 * 60 * 60
+    # How long a duplicate waits for the original request to finish
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+
+    # Background jobs (services/jobs): worker threads per app process;
+    # 0 leaves them to a separate scripts/run_jobs.py process
+    JOB_WORKERS: int = 2
+    JOB_BATCH_SIZE: int = 10
+    JOB_POLL_SECONDS: float = 2.0
+    # A job not finished this long after being leased is handed out again
+    JOB_VISIBILITY_TIMEOUT_SECONDS: int = 300
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 10.0
+    JOB_RETRY_MAX_SECONDS: float = 3600.0
+
+    # Sales analytics rollups are bucketed by local day in this zone
+    ANALYTICS_TIMEZONE: str = "Asia/Kolkata"
+
+    # Online payments via Razorpay (the /payments routes); COD only when off
+    PAYMENTS_ENABLED: bool = False
     RAZORPAY_KEY_ID: str = "rzp_test_placeholder"
     RAZORPAY_KEY_SECRET: str = "rzp_secret_placeholder"
     RAZORPAY_WEBHOOK_SECRET: str = "webhook_secret_placeholder"
+    # Razorpay API client (services/razorpay_gateway); point the URL at
+    # scripts/fake_razorpay.py for offline testing
+    RAZORPAY_API_BASE_URL: str = "https://api.razorpay.com/v1"
+    RAZORPAY_CONNECT_TIMEOUT_SECONDS: float = 3.05
+    RAZORPAY_READ_TIMEOUT_SECONDS: float = 10.0
+    # Kept-alive connections; matches the sync endpoint threadpool (40)
+    RAZORPAY_POOL_SIZE: int = 40
+    # Consecutive failures that open the circuit, and how long it stays open
+    RAZORPAY_BREAKER_FAILURES: int = 5
+    RAZORPAY_BREAKER_RESET_SECONDS: float = 30.0
+    # Retries allowed per call made, on top of RAZORPAY_MAX_RETRIES per call
+    RAZORPAY_RETRY_BUDGET: float = 0.1
+    RAZORPAY_MAX_RETRIES: int = 2
+    # Payment reconciliation (services/reconciliation): online payments
+    # still pending are re-checked with Razorpay, for missed webhooks
+    RECONCILE_INTERVAL_SECONDS: int = 600
+    RECONCILE_BATCH_SIZE: int = 100
+    # Concurrent Razorpay lookups per batch
+    RECONCILE_CONCURRENCY: int = 8
+    # Recent checkouts are left to their webhooks; past this age, one
+    # that never got a Razorpay order (its request died) fails
+    RECONCILE_MIN_AGE_MINUTES: int = 15
+    # A checkout with no payment in progress after this long has failed
+    RECONCILE_ABANDON_AFTER_MINUTES: int = 60
+    # Webhook inbox processing (services/payment_events)
+    RAZORPAY_EVENT_BATCH_SIZE: int = 200
+    RAZORPAY_EVENT_POLL_SECONDS: float = 2.0
+    RAZORPAY_EVENT_RETENTION_DAYS: int = 30
 
     class Config:
         case_sensitive = True
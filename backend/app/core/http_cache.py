@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, NamedTuple, Optional
+import hashlib
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+
+class CachedPayload(NamedTuple):
+    """Pre-serialized JSON body plus the validators sent with it."""
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime]
+    surrogate_keys: str
+
+
+def make_payload(
+    body: bytes,
+    last_modified: Optional[datetime] = None,
+    surrogate_keys: Iterable[str] = (),
+) -> CachedPayload:
+    # Strong validator: identical bytes <=> identical ETag on every worker
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    if last_modified is not None:
+        if last_modified.tzinfo is None:
+            # SQLite hands back naive UTC timestamps
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        last_modified = last_modified.astimezone(timezone.utc)
+    return CachedPayload(body, etag, last_modified, " ".join(dict.fromkeys(surrogate_keys)))
+
+
+def cache_control() -> str:
+    return (
+        f"public, max-age={settings.CATALOG_CACHE_MAX_AGE}, "
+        f"s-maxage={settings.CATALOG_CACHE_S_MAXAGE}, "
+        f"stale-while-revalidate={settings.CATALOG_CACHE_STALE_WHILE_REVALIDATE}"
+    )
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _not_modified_since(if_modified_since: str, last_modified: Optional[datetime]) -> bool:
+    if last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return last_modified.replace(microsecond=0) <= since
+
+
+def conditional_response(request: Request, payload: CachedPayload) -> Response:
+    """
+    Serve `payload` with ETag / Last-Modified / Cache-Control /
+    Surrogate-Key headers, or a bodiless 304 when the client's copy
+    is still current.
+    """
+    headers = {"ETag": payload.etag, "Cache-Control": cache_control()}
+    if payload.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(payload.last_modified, usegmt=True)
+    if payload.surrogate_keys:
+        headers["Surrogate-Key"] = payload.surrogate_keys
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = etag_matches(if_none_match, payload.etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        not_modified = bool(if_modified_since) and _not_modified_since(
+            if_modified_since, payload.last_modified
+        )
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
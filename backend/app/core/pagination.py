@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import Any, List, Sequence
+import base64
+import json
+
+from sqlalchemy import String, and_, literal, or_
+from sqlalchemy.orm import Session
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the sort-key values of the last row of a page into an
+    opaque, URL-safe cursor.
+    """
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Inverse of encode_cursor. Raises ValueError for anything that was
+    not produced by encode_cursor with `size` key columns.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Malformed cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Malformed cursor")
+    return values
+
+
+def datetime_key(db: Session, raw: str) -> Any:
+    """
+    Turn a timestamp taken from a cursor back into a bind value.
+    SQLite stores DateTime as text (and CURRENT_TIMESTAMP has no
+    fractional part), so there we compare against that exact text form
+    to keep ties on the timestamp from repeating rows across pages.
+    """
+    value = datetime.fromisoformat(raw)
+    if db.get_bind().dialect.name == "sqlite":
+        return literal(raw.replace("T", " "), String)
+    return value
+
+
+def keyset_after(columns: Sequence[Any], values: Sequence[Any], descending: bool = False):
+    """
+    Row-value comparison `(c1, c2, ...) > (v1, v2, ...)` (or `<` when
+    descending), expanded into AND/OR so it works on every backend and
+    can use a composite index on the same columns.
+    """
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        step = column < value if descending else column > value
+        prefix = [c == v for c, v in zip(columns[:i], values[:i])]
+        clauses.append(and_(*prefix, step))
+    return or_(*clauses)
@@ -0,0 +1,35 @@
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def adapter_for(tp: Any) -> TypeAdapter:
+    """One TypeAdapter per response type; building them is expensive."""
+    return TypeAdapter(tp)
+
+
+def dump_json(tp: Any, value: Any) -> bytes:
+    """
+    Validate ORM objects (or dicts holding them) against `tp` and dump
+    straight to JSON bytes. Both steps run inside pydantic-core, skipping
+    FastAPI's response_model round trip through Python dicts,
+    jsonable_encoder and json.dumps.
+    """
+    adapter = adapter_for(tp)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+class JSONBytesResponse(Response):
+    """
+    Response for bodies that are already JSON bytes. Returning it from an
+    endpoint bypasses response_model serialization, so the endpoint must
+    produce the body with dump_json against that same model.
+    """
+    media_type = "application/json"
+
+
+def fast_json(tp: Any, value: Any, **kwargs: Any) -> JSONBytesResponse:
+    return JSONBytesResponse(content=dump_json(tp, value), **kwargs)
@@ -5,3 +5,9 @@ from app.models.user import User  # noqa
 from app.models.product import Product  # noqa
 from app.models.order import Order, OrderItem  # noqa
 from app.models.address import Address  # noqa
+from app.models.category_stats import CategoryStats  # noqa
+from app.models.idempotency_key import IdempotencyKey  # noqa
+from app.models.sales_stats import SalesDaily, ProductSalesDaily  # noqa
+from app.models.job import Job  # noqa
+from app.models.razorpay_event import RazorpayEvent  # noqa
+from app.models.checkpoint import Checkpoint  # noqa
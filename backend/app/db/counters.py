@@ -0,0 +1,33 @@
+from typing import Any, Dict
+
+from sqlalchemy.orm import Session
+
+
+def increment(db: Session, model: Any, key: Dict[str, Any], deltas: Dict[str, Any]) -> None:
+    """
+    Atomically add `deltas` to the counter row identified by `key`,
+    creating it if missing. Runs as a single upsert statement on
+    Postgres and SQLite so concurrent writers never lose an update.
+    """
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        updated = db.execute(
+            table.update()
+            .where(*(table.c[k] == v for k, v in key.items()))
+            .values({table.c[c]: table.c[c] + d for c, d in deltas.items()})
+        ).rowcount
+        if not updated:
+            db.execute(table.insert().values(**key, **deltas))
+        return
+
+    stmt = insert(table).values(**key, **deltas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(key),
+        set_={c: table.c[c] + stmt.excluded[c] for c in deltas},
+    )
+    db.execute(stmt)
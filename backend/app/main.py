@@ -5,6 +5,7 @@ from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request as StarletteRequest
+from contextlib import asynccontextmanager
 from app.core.config import settings
 import os
 import logging
@@ -13,9 +14,47 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown hooks."""
+    if settings.PRODUCT_CACHE_WARM_ON_STARTUP:
+        from app.db.session import SessionLocal
+        from app.services.catalog import product_cache, warm_product_cache
+        from app.services.storefront import HOME_KEY, build_home
+
+        db = SessionLocal()
+        try:
+            warm_product_cache(db)
+            product_cache.set(HOME_KEY, build_home(db))
+        except Exception as e:
+            # A cold cache is fine; never block startup on it
+            logger.warning(f"Product cache warm-up failed: {str(e)}")
+        finally:
+            db.close()
+
+    from app.services import jobs
+
+    if settings.JOB_WORKERS:
+        from app.db.session import SessionLocal
+
+        db = SessionLocal()
+        try:
+            jobs.schedule_periodic(db)
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Scheduling periodic jobs failed: {str(e)}")
+        finally:
+            db.close()
+        jobs.start_workers(settings.JOB_WORKERS)
+    yield
+    jobs.stop_workers()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # CORS origins - can be overridden via environment variable
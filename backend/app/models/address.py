@@ -8,7 +8,7 @@ class Address(Base):
     __tablename__ = "addresses"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
     
     street = Column(String, nullable=False)
     city = Column(String, nullable=False)
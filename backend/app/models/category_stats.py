@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String
+from app.db.base_class import Base
+
+class CategoryStats(Base):
+    """
+    Live (non-deleted) product counts per category. Maintained
+    incrementally by the product write paths; see services/category_stats.
+    """
+    __tablename__ = "category_stats"
+
+    category = Column(String, primary_key=True)
+    product_count = Column(Integer, nullable=False, default=0)
+    featured_count = Column(Integer, nullable=False, default=0)
+    holiday_special_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, DateTime, String
+from app.db.base_class import Base
+
+class Checkpoint(Base):
+    """
+    How far a resumable batch job has got, so a run that stops part way
+    (crash, deploy, Razorpay outage) picks up where it left off. See
+    services/reconciliation.
+    """
+    __tablename__ = "checkpoints"
+
+    name = Column(String, primary_key=True)
+    # Keyset cursor (core.pagination.encode_cursor) of the last row
+    # done; NULL starts a new pass
+    cursor = Column(String, nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
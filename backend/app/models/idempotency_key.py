@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String
+from app.db.base_class import Base
+
+class IdempotencyKey(Base):
+    """
+    Stored responses for requests sent with an Idempotency-Key header,
+    scoped per user. A row without a status_code is still being
+    processed. Rows expire after IDEMPOTENCY_KEY_TTL_SECONDS; see
+    services/idempotency.
+    """
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    # sha256 of the route and request body, to refuse a key reused for a different request
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
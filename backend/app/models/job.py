@@ -0,0 +1,29 @@
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text
+from app.db.base_class import Base
+
+class Job(Base):
+    """
+    Background work queued by request handlers and run by the in-process
+    workers (see services/jobs). A job is deleted once it succeeds; one
+    that runs out of attempts stays behind as "dead" for inspection.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Dequeue: due jobs, oldest first
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String(64), nullable=False)
+    payload = Column(JSON, nullable=True)
+    # Optional dedupe key: at most one pending job per key
+    key = Column(String, nullable=True, unique=True)
+    # queued, running or dead
+    status = Column(String(16), nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    # When a queued job becomes due, or when a running job's lease ends
+    # and it is handed to another worker (the visibility timeout)
+    run_at = Column(DateTime(timezone=True), nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
@@ -12,9 +12,30 @@ class OrderStatus(str, enum.Enum):
     DELIVERED = "delivered"
     CANCELLED = "cancelled"
     FAILED = "failed"
+    PAID = "paid" # Online payment captured
+
+VALID_STATUSES = frozenset(status.value for status in OrderStatus)
+
+# Orders in these states hold no stock and don't count as sales
+RELEASED_STATUSES = frozenset({OrderStatus.CANCELLED.value, OrderStatus.FAILED.value})
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Admin listing / keyset pagination (newest first)
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        # A customer's own orders, newest first; also covers the user_id FK
+        Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+        # Admin search by status, newest first
+        Index("ix_orders_status_created_at_id", "status", "created_at", "id"),
+        # Razorpay webhooks and reconciliation look orders up by it
+        Index("ix_orders_razorpay_order_id", "razorpay_order_id", unique=True),
+        # Reconciliation pages through pending payments, oldest first
+        Index("ix_orders_payment_status_created_at_id", "payment_status", "created_at", "id"),
+        # Postgres also has pg_trgm GIN indexes on customer_name and on the
+        # digits of phone for substring search (migration only; see
+        # services.orders.filter_orders)
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"))
@@ -35,7 +56,11 @@ class Order(Base):
     # I will comment them out to "remove" integration as requested, but keeping them in DB might be cleaner if we roll back. 
     # However, prompt says "Ensure orders table has... items, total_amount, payment_method (COD), status...".
     # I will add the requested fields.
-    
+    razorpay_order_id = Column(String, nullable=True)
+    razorpay_payment_id = Column(String, nullable=True)
+    # pending / captured / failed for online payments; unset for COD
+    payment_status = Column(String, nullable=True)
+
     user = relationship("User", back_populates="orders")
     items = relationship("OrderItem", back_populates="order")
 
@@ -43,10 +68,21 @@ class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    order_id = Column(String, ForeignKey("orders.id"))
-    product_id = Column(String, ForeignKey("products.id"))
+    order_id = Column(String, ForeignKey("orders.id"), index=True)
+    product_id = Column(String, ForeignKey("products.id"), index=True)
     quantity = Column(Integer, nullable=False)
     price_at_purchase = Column(Float, nullable=False)
 
+    # Snapshot of the product at purchase time, so order views never
+    # need the product (which may since be edited or soft-deleted).
+    # Inline (data:) images are not copied: image_url is only kept for
+    # remote images, and image_version addresses the product's image
+    # endpoint either way.
+    product_name = Column(String, nullable=True)
+    product_slug = Column(String, nullable=True)
+    image_url = Column(String, nullable=True)
+    image_version = Column(String(16), nullable=True)
+    discount_percentage = Column(Float, nullable=True)
+
     order = relationship("Order", back_populates="items")
     product = relationship("Product", back_populates="order_items")
@@ -1,10 +1,20 @@
-from sqlalchemy import Boolean, Column, Integer, String, Float, Text
+from sqlalchemy import Boolean, Column, Computed, Integer, String, Float, Text, DateTime, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from app.db.base_class import Base
 import uuid
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Storefront listings always filter on is_deleted, usually by category too
+        Index("ix_products_is_deleted_category", "is_deleted", "category"),
+        # Price-range filters and the price / newest sorts
+        Index("ix_products_is_deleted_effective_price", "is_deleted", "effective_price", "id"),
+        Index("ix_products_is_deleted_created_at", "is_deleted", "created_at", "id"),
+        # Listing Last-Modified is the latest product write (catalog.catalog_last_modified)
+        Index("ix_products_updated_at", "updated_at"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, nullable=False)
@@ -12,11 +22,19 @@ class Product(Base):
     description = Column(Text, nullable=True)
     price = Column(Float, nullable=False) # Float for simplicity in MVP, Decimal preferred for production but SQLite/Postgres handling differs slightly in simple setups. We'll use Float for now or Numeric. let's use Float for ease with Pydantic.
     discount_percentage = Column(Float, default=0.0)
+    # Price after discount, maintained by the database on every write
+    effective_price = Column(
+        Float,
+        Computed("price * (1 - coalesce(discount_percentage, 0) / 100.0)", persisted=True),
+    )
     stock = Column(Integer, default=0)
     image_url = Column(String, nullable=True)
     category = Column(String, index=True, nullable=True)
     is_featured = Column(Boolean, default=False)
     is_holiday_special = Column(Boolean, default=False)
     is_deleted = Column(Boolean, default=False)
+    created_at = Column(DateTime(timezone=True), default=func.now(), server_default=func.now())
+    # Bumped on every write; drives Last-Modified/ETag for catalog responses
+    updated_at = Column(DateTime(timezone=True), default=func.now(), server_default=func.now(), onupdate=func.now())
 
     order_items = relationship("OrderItem", back_populates="product")
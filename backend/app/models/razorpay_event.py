@@ -0,0 +1,23 @@
+from sqlalchemy import Column, DateTime, Index, String, Text
+from app.db.base_class import Base
+
+class RazorpayEvent(Base):
+    """
+    Inbox of verified Razorpay webhook deliveries, keyed by Razorpay's
+    event id so redeliveries are stored once. The webhook only appends
+    here; services/payment_events applies them in batches and stamps
+    processed_at.
+    """
+    __tablename__ = "razorpay_events"
+    __table_args__ = (
+        # Unprocessed events, oldest first
+        Index("ix_razorpay_events_processed_at_received_at", "processed_at", "received_at"),
+    )
+
+    id = Column(String, primary_key=True)
+    # Raw request body, exactly as signed
+    body = Column(Text, nullable=False)
+    received_at = Column(DateTime(timezone=True), nullable=False)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+    # Why the event was skipped, e.g. no matching order
+    error = Column(Text, nullable=True)
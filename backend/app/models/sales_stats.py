@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Date, Float, Integer, String
+from app.db.base_class import Base
+
+class SalesDaily(Base):
+    """
+    Order count and revenue per local day (ANALYTICS_TIMEZONE) of
+    creation and current status. An order moves between status rows as
+    it progresses. Maintained incrementally by the order write paths;
+    see services/sales_stats.
+    """
+    __tablename__ = "sales_daily"
+
+    day = Column(Date, primary_key=True)
+    status = Column(String, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+class ProductSalesDaily(Base):
+    """
+    Units sold and revenue per product and local day, counting only
+    orders that still hold their stock (not cancelled or failed).
+    """
+    __tablename__ = "product_sales_daily"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(String, primary_key=True)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
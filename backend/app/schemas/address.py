@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class AddressBase(BaseModel):
@@ -31,3 +31,7 @@ class AddressInDBBase(AddressBase):
 
 class Address(AddressInDBBase):
     pass
+
+class AddressPage(BaseModel):
+    items: List[Address]
+    next_cursor: Optional[str] = None
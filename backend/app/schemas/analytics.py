@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import date
+
+class DailySales(BaseModel):
+    day: date
+    orders: int
+    revenue: float
+
+class ProductSales(BaseModel):
+    product_id: str
+    name: Optional[str] = None
+    slug: Optional[str] = None
+    units: int
+    revenue: float
+
+class SalesSummary(BaseModel):
+    start: date
+    end: date
+    total_orders: int
+    total_revenue: float
+    average_order_value: float
+    orders_by_status: Dict[str, int]
+    daily: List[DailySales]
+    top_products: List[ProductSales]
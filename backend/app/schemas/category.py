@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+class CategoryFacet(BaseModel):
+    category: str
+    product_count: int
+    featured_count: int
+    holiday_special_count: int
+
+    class Config:
+        from_attributes = True
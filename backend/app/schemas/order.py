@@ -1,10 +1,10 @@
-from pydantic import BaseModel
-from typing import List, Optional, Any
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Any
 from datetime import datetime
 
 class OrderItemBase(BaseModel):
     product_id: str
-    quantity: int
+    quantity: int = Field(..., gt=0)
 
 class OrderItemCreate(OrderItemBase):
     pass
@@ -12,12 +12,19 @@ class OrderItemCreate(OrderItemBase):
 class OrderItem(OrderItemBase):
     id: str
     price_at_purchase: float
+    # Product snapshot taken at purchase; build the image URL from
+    # image_url, or from /products/{product_slug}/image?v={image_version}
+    product_name: Optional[str] = None
+    product_slug: Optional[str] = None
+    image_url: Optional[str] = None
+    image_version: Optional[str] = None
+    discount_percentage: Optional[float] = None
     
     class Config:
         from_attributes = True
 
 class OrderCreate(BaseModel):
-    items: List[OrderItemCreate]
+    items: List[OrderItemCreate] = Field(..., min_length=1)
     shipping_address: Optional[Any] = None
     customer_name: str
     phone: str
@@ -28,6 +35,7 @@ class Order(BaseModel):
     customer_name: Optional[str] = None
     phone: Optional[str] = None
     payment_method: Optional[str] = "COD"
+    payment_status: Optional[str] = None
     status: str
     total_amount: float
     created_at: datetime
@@ -36,3 +44,17 @@ class Order(BaseModel):
 
     class Config:
         from_attributes = True
+
+class OrderPage(BaseModel):
+    items: List[Order]
+    next_cursor: Optional[str] = None
+
+class OrderStatusBulkUpdate(BaseModel):
+    order_ids: List[str] = Field(..., min_length=1, max_length=1000)
+    status: str
+
+class OrderStatusResult(BaseModel):
+    order_id: str
+    result: Literal["updated", "unchanged", "invalid_transition", "not_found"]
+    previous_status: Optional[str] = None
+    status: Optional[str] = None
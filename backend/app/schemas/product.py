@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, computed_field
+from typing import List, Optional
 
 class ProductBase(BaseModel):
     name: str
@@ -25,6 +25,20 @@ class ProductUpdate(ProductBase):
 class Product(ProductBase):
     id: str
     slug: str
+    effective_price: Optional[float] = None
+
+    @computed_field
+    @property
+    def image_version(self) -> Optional[str]:
+        # Pass as `v` to /products/{slug}/image for an immutable URL
+        if not self.image_url:
+            return None
+        from app.services.images import source_version
+        return source_version(self.image_url)
 
     class Config:
         from_attributes = True
+
+class ProductPage(BaseModel):
+    items: List[Product]
+    next_cursor: Optional[str] = None
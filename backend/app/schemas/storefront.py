@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import List
+from app.schemas.product import Product
+
+class CategoryRow(BaseModel):
+    category: str
+    product_count: int
+    products: List[Product]
+
+class HomePage(BaseModel):
+    featured: List[Product]
+    holiday_specials: List[Product]
+    categories: List[CategoryRow]
@@ -0,0 +1,245 @@
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import logging
+import re
+
+from sqlalchemy import Row, func, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.http_cache import CachedPayload, make_payload
+from app.core.pagination import datetime_key, decode_cursor, encode_cursor, keyset_after
+from app.core.serialization import dump_json
+from app.models.product import Product
+from app.schemas.category import CategoryFacet
+from app.schemas.product import Product as ProductSchema, ProductPage
+
+logger = logging.getLogger(__name__)
+
+# Cache keys are tuples whose first element is the entry kind; values are
+# CachedPayloads (JSON bytes + ETag/Last-Modified/Surrogate-Key):
+#   ("list", filters, skip, limit, cursor)  -> a product page
+#   ("search", terms, skip, limit)          -> ranked search results
+#   ("facets",)                             -> category facet counts
+#   ("home",)                               -> storefront home page sections
+#   ("slug", slug) / ("id", id)             -> a single product
+# Serializers only read attributes, so they take ORM objects and Core
+# rows alike.
+product_cache = TTLCache(
+    maxsize=settings.PRODUCT_CACHE_MAXSIZE,
+    ttl=settings.PRODUCT_CACHE_TTL_SECONDS,
+)
+LISTING_KINDS = ("list", "search", "facets", "home")
+
+DEFAULT_PAGE_SIZE = 100
+
+
+class ProductFilters(NamedTuple):
+    """Listing filters; a tuple so it can be part of a cache key."""
+    category: Optional[str] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    sort: Optional[str] = None
+
+
+# sort -> (key columns, descending). Every order ends on id so keyset
+# cursors are unique; the multi-column ones match composite indexes.
+SORTS: Dict[Optional[str], Tuple[Sequence[str], bool]] = {
+    None: (("id",), False),
+    "price_asc": (("effective_price", "id"), False),
+    "price_desc": (("effective_price", "id"), True),
+    "newest": (("created_at", "id"), True),
+}
+
+
+def surrogate_key(product_id: str) -> str:
+    return f"product-{product_id}"
+
+
+def catalog_updated_at():
+    """
+    Column for listing queries: the time of the latest write to any
+    product, deleted ones included. Listings use it as Last-Modified:
+    the newest product on a page would go backwards when a product
+    leaves it (deleted, repriced, recategorized), and a client
+    revalidating with If-Modified-Since would keep the stale list. A
+    subquery on ix_products_updated_at, so it costs no extra statement.
+    """
+    latest = Product.__table__.alias("latest")
+    return select(func.max(latest.c.updated_at)).scalar_subquery().label("catalog_updated_at")
+
+
+def listing_payload(body: bytes, products: Sequence[Any], keys: Iterable[str]) -> CachedPayload:
+    # "products" tags every listing so a catalog-wide purge is one key
+    return make_payload(
+        body,
+        products[0].catalog_updated_at if products else None,
+        ["products", *keys, *(surrogate_key(p.id) for p in products)],
+    )
+
+
+def serialize_product(product: Product) -> CachedPayload:
+    body = dump_json(ProductSchema, product)
+    return make_payload(body, product.updated_at, [surrogate_key(product.id)])
+
+
+def serialize_products(products: Sequence[Any], *keys: str) -> CachedPayload:
+    body = dump_json(List[ProductSchema], products)
+    return listing_payload(body, products, keys)
+
+
+def serialize_product_page(
+    products: Sequence[Any], limit: int, sort: Optional[str], *keys: str
+) -> CachedPayload:
+    """Cursor-mode page: items plus the cursor for the page after it."""
+    next_cursor = None
+    if products and len(products) == limit:
+        columns, _ = SORTS[sort]
+        next_cursor = encode_cursor([getattr(products[-1], name) for name in columns])
+    body = dump_json(ProductPage, {"items": products, "next_cursor": next_cursor})
+    return listing_payload(body, products, keys)
+
+
+def serialize_facets(facets: List[Any]) -> CachedPayload:
+    body = dump_json(List[CategoryFacet], facets)
+    return make_payload(body, None, ["products", "categories"])
+
+
+def category_key(category: Optional[str]) -> str:
+    if not category:
+        return "category-all"
+    return "category-" + re.sub(r"[^a-z0-9]+", "-", category.lower()).strip("-")
+
+
+def list_key(
+    filters: ProductFilters, skip: int, limit: int, cursor: Optional[str] = None
+) -> tuple:
+    return ("list", filters, skip, limit, cursor)
+
+
+def _live_products(filters: ProductFilters):
+    # Plain rows off the products table: listings are read-only, so
+    # there is no point building and tracking ORM instances for them
+    stmt = select(Product.__table__, catalog_updated_at()).where(Product.is_deleted == False)
+    if filters.category:
+        stmt = stmt.where(Product.category == filters.category)
+    if filters.min_price is not None:
+        stmt = stmt.where(Product.effective_price >= filters.min_price)
+    if filters.max_price is not None:
+        stmt = stmt.where(Product.effective_price <= filters.max_price)
+    return stmt
+
+
+def _order_by(filters: ProductFilters) -> List[Any]:
+    columns, descending = SORTS[filters.sort]
+    return [
+        getattr(Product, name).desc() if descending else getattr(Product, name)
+        for name in columns
+    ]
+
+
+def query_product_page(
+    db: Session, filters: ProductFilters, skip: int, limit: int
+) -> List[Row]:
+    stmt = _live_products(filters)
+    if filters.sort:
+        stmt = stmt.order_by(*_order_by(filters))
+    return db.execute(stmt.offset(skip).limit(limit)).all()
+
+
+def _cursor_values(db: Session, columns: Sequence[str], values: List[Any]) -> List[Any]:
+    bound = []
+    for name, value in zip(columns, values):
+        if name == "created_at":
+            if not isinstance(value, str):
+                raise ValueError("Malformed cursor")
+            # Raises ValueError for a string that isn't an ISO timestamp
+            value = datetime_key(db, value)
+        elif name == "effective_price" and (
+            not isinstance(value, (int, float)) or isinstance(value, bool)
+        ):
+            raise ValueError("Malformed cursor")
+        elif name == "id" and not isinstance(value, str):
+            raise ValueError("Malformed cursor")
+        bound.append(value)
+    return bound
+
+
+def query_product_keyset(
+    db: Session, filters: ProductFilters, cursor: str, limit: int
+) -> List[Row]:
+    """
+    Keyset page in the order given by `filters.sort` (id by default).
+    An empty cursor starts from the beginning; raises ValueError for a
+    malformed cursor.
+    """
+    names, descending = SORTS[filters.sort]
+    stmt = _live_products(filters)
+    if cursor:
+        values = _cursor_values(db, names, decode_cursor(cursor, len(names)))
+        stmt = stmt.where(
+            keyset_after([getattr(Product, name) for name in names], values, descending)
+        )
+    return db.execute(stmt.order_by(*_order_by(filters)).limit(limit)).all()
+
+
+def cache_product_detail(product: Product) -> CachedPayload:
+    payload = serialize_product(product)
+    product_cache.set(("slug", product.slug), payload)
+    product_cache.set(("id", product.id), payload)
+    return payload
+
+
+def invalidate_product(product_id: str, *slugs: str) -> None:
+    """
+    Drop a product's detail entries and every cached listing.
+    Listings are cheap to rebuild and any write can move a product
+    between pages, so they are always evicted together.
+    """
+    product_cache.delete(("id", product_id))
+    for slug in slugs:
+        if slug:
+            product_cache.delete(("slug", slug))
+    invalidate_listings()
+
+
+def invalidate_products(slugs_by_id: Dict[str, str]) -> None:
+    """invalidate_product for many products, evicting listings once."""
+    for product_id, slug in slugs_by_id.items():
+        product_cache.delete(("id", product_id))
+        product_cache.delete(("slug", slug))
+    if slugs_by_id:
+        invalidate_listings()
+
+
+def invalidate_listings() -> None:
+    product_cache.delete_where(lambda key: key[0] in LISTING_KINDS)
+
+
+def warm_product_cache(db: Session) -> int:
+    """
+    Pre-load the default listing, each category's first page and
+    the detail entries of those products. Returns entries written.
+    """
+    categories = [None] + [
+        row[0]
+        for row in db.query(Product.category)
+        .filter(Product.is_deleted == False, Product.category.isnot(None))
+        .distinct()
+        .all()
+    ]
+    written = 0
+    for category in categories:
+        filters = ProductFilters(category=category)
+        products = query_product_page(db, filters, 0, DEFAULT_PAGE_SIZE)
+        product_cache.set(
+            list_key(filters, 0, DEFAULT_PAGE_SIZE),
+            serialize_products(products, category_key(category)),
+        )
+        written += 1
+        if category is None:
+            for product in products:
+                cache_product_detail(product)
+                written += 2
+    logger.info(f"Product cache warmed with {written} entries")
+    return written
@@ -0,0 +1,76 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.db.counters import increment
+from app.models.category_stats import CategoryStats
+
+# (category, is_featured, is_holiday_special) of a live product, or None
+# when the product does not count towards any facet.
+Facet = Optional[Tuple[str, bool, bool]]
+
+
+def facet_of(product: Any) -> Facet:
+    if product.is_deleted or not product.category:
+        return None
+    return (product.category, bool(product.is_featured), bool(product.is_holiday_special))
+
+
+class FacetDeltas:
+    """
+    Collects per-category count changes from product writes so they can
+    be applied to category_stats in the same transaction, one upsert per
+    touched category.
+
+        deltas = FacetDeltas()
+        deltas.remove(facet_of(product))   # before the change
+        ...mutate product...
+        deltas.add(facet_of(product))      # after the change
+        deltas.apply(db)
+    """
+
+    def __init__(self):
+        self._deltas: Dict[str, List[int]] = defaultdict(lambda: [0, 0, 0])
+
+    def _bump(self, facet: Facet, sign: int) -> None:
+        if facet is None:
+            return
+        category, featured, holiday = facet
+        counts = self._deltas[category]
+        counts[0] += sign
+        counts[1] += sign * featured
+        counts[2] += sign * holiday
+
+    def add(self, facet: Facet) -> None:
+        self._bump(facet, 1)
+
+    def remove(self, facet: Facet) -> None:
+        self._bump(facet, -1)
+
+    def apply(self, db: Session) -> None:
+        # Sorted so concurrent transactions lock the rows in the same
+        # order, as SalesDeltas.apply does
+        for category, (products, featured, holiday) in sorted(self._deltas.items()):
+            if products or featured or holiday:
+                increment(
+                    db,
+                    CategoryStats,
+                    {"category": category},
+                    {
+                        "product_count": products,
+                        "featured_count": featured,
+                        "holiday_special_count": holiday,
+                    },
+                )
+        self._deltas.clear()
+
+
+def list_facets(db: Session) -> List[CategoryStats]:
+    return (
+        db.query(CategoryStats)
+        .filter(CategoryStats.product_count > 0)
+        .order_by(CategoryStats.category)
+        .all()
+    )
+
@@ -0,0 +1,144 @@
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import and_, delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.serialization import JSONBytesResponse
+from app.models.idempotency_key import IdempotencyKey
+from app.services import jobs
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class KeyReused(ValueError):
+    def __init__(self):
+        super().__init__("Idempotency-Key was already used for a different request")
+
+
+class KeyInFlight(RuntimeError):
+    def __init__(self):
+        super().__init__("A request with this Idempotency-Key is still being processed")
+
+
+class StoredResponse(NamedTuple):
+    status_code: int
+    body: bytes
+
+
+def fingerprint(route: str, body: BaseModel) -> str:
+    return hashlib.sha256(f"{route}\n{body.model_dump_json()}".encode()).hexdigest()
+
+
+def _match(user_id: str, key: str):
+    return and_(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+
+
+def _insert(db: Session, user_id: str, key: str, request_hash: str) -> bool:
+    """
+    Insert an in-flight row for the key, taking over an expired one.
+    Returns False if a live row already exists. On Postgres a concurrent
+    duplicate blocks on the unique index here until the first request's
+    transaction ends.
+    """
+    table = IdempotencyKey.__table__
+    now = datetime.now(timezone.utc)
+    values = {
+        "user_id": user_id,
+        "key": key,
+        "request_hash": request_hash,
+        "status_code": None,
+        "response_body": None,
+        "created_at": now,
+        "expires_at": now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+    }
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        db.execute(delete(table).where(_match(user_id, key), table.c.expires_at < now))
+        try:
+            with db.begin_nested():
+                db.execute(table.insert().values(**values))
+        except IntegrityError:
+            return False
+        return True
+
+    stmt = insert(table).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "key"],
+        set_={c: stmt.excluded[c] for c in values if c not in ("user_id", "key")},
+        where=table.c.expires_at < now,
+    )
+    return db.execute(stmt.returning(table.c.key)).first() is not None
+
+
+def claim(db: Session, user_id: str, key: str, request_hash: str) -> Optional[StoredResponse]:
+    """
+    Claim `key` for this request, or wait for the request that owns it.
+
+    Returns None once the caller owns the key: it goes on to do the work
+    and calls `complete` in the same transaction (or `release` to give
+    the key up). Returns the stored response when the key has already
+    been answered. Raises KeyReused if the key belongs to a different
+    request, and KeyInFlight if the owner is still running after
+    IDEMPOTENCY_WAIT_SECONDS.
+
+    Must run before anything else in the session's transaction: waiting
+    rolls it back so the owner is never blocked on this session.
+    """
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    delay = 0.05
+    while True:
+        if _insert(db, user_id, key, request_hash):
+            return None
+        row = db.execute(
+            select(IdempotencyKey.request_hash, IdempotencyKey.status_code, IdempotencyKey.response_body)
+            .where(_match(user_id, key))
+        ).first()
+        db.rollback()
+        if row is None:
+            # The owner gave the key up (or it expired) since our insert
+            continue
+        if row.request_hash != request_hash:
+            raise KeyReused()
+        if row.status_code is not None:
+            return StoredResponse(row.status_code, row.response_body)
+        if time.monotonic() >= deadline:
+            raise KeyInFlight()
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+
+def complete(db: Session, user_id: str, key: str, response: JSONBytesResponse) -> None:
+    """Store the response for replay; commits with the caller's transaction."""
+    db.execute(
+        update(IdempotencyKey)
+        .where(_match(user_id, key))
+        .values(status_code=response.status_code, response_body=bytes(response.body))
+    )
+
+
+def release(db: Session, user_id: str, key: str) -> None:
+    """Give the key up so a retry runs the request again."""
+    db.execute(delete(IdempotencyKey).where(_match(user_id, key)))
+
+
+def replay(stored: StoredResponse) -> JSONBytesResponse:
+    return JSONBytesResponse(
+        content=stored.body, status_code=stored.status_code, headers={REPLAYED_HEADER: "true"}
+    )
+
+
+@jobs.handler("idempotency.purge_expired", every=60 * 60)
+def purge_expired(db: Session, payload: Optional[dict] = None) -> int:
+    return db.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.now(timezone.utc))
+    ).rowcount
@@ -0,0 +1,164 @@
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from io import BytesIO
+from typing import Dict, Optional
+from urllib.parse import unquote_to_bytes, urljoin
+import base64
+import hashlib
+import threading
+
+import requests
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+from app.core.disk_cache import DiskLRUCache
+
+# Requested widths snap up to one of these so a handful of variants per
+# image cover every layout, and the cache cannot be filled with one-off
+# sizes.
+WIDTHS = (160, 320, 480, 640, 960, 1280, 1920)
+FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+}
+RESIZE_TIMEOUT_SECONDS = 30
+
+# Refuse to decode anything bigger than ~50 megapixels
+Image.MAX_IMAGE_PIXELS = 50_000_000
+
+variant_cache = DiskLRUCache(settings.IMAGE_CACHE_DIR, settings.IMAGE_CACHE_MAX_BYTES)
+_pool = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_RESIZE_WORKERS, thread_name_prefix="image-resize"
+)
+_inflight: Dict[str, Future] = {}
+# Reentrant: a future that is already done runs its callback immediately
+_inflight_lock = threading.RLock()
+
+
+class ImageSourceError(Exception):
+    """The original image could not be fetched."""
+
+
+class ResizeTimeout(Exception):
+    """The variant is still rendering; it is cached once done, so retry."""
+
+
+def source_version(image_url: str) -> str:
+    """
+    Content hash of the original. Uploaded images are stored inline as
+    data: URLs, so hashing image_url hashes the bytes themselves; remote
+    originals are treated as immutable per URL.
+    """
+    return hashlib.blake2b(image_url.encode(), digest_size=8).hexdigest()
+
+
+def snap_width(width: int) -> int:
+    for allowed in WIDTHS:
+        if allowed >= width:
+            return allowed
+    return WIDTHS[-1]
+
+
+def variant_key(version: str, width: int, fmt: str) -> str:
+    return f"{version}-{width}.{fmt}"
+
+
+def load_source(image_url: str) -> bytes:
+    """
+    The original image's bytes, at most IMAGE_MAX_SOURCE_BYTES. Remote
+    originals are fetched without following redirects, so an image_url
+    can't bounce the server on to an internal address.
+    """
+    if image_url.startswith("data:"):
+        header, _, data = image_url.partition(",")
+        if header.endswith(";base64"):
+            if len(data) * 3 // 4 > settings.IMAGE_MAX_SOURCE_BYTES:
+                raise ImageSourceError("Original image is too large")
+            return base64.b64decode(data)
+        data = unquote_to_bytes(data)
+        if len(data) > settings.IMAGE_MAX_SOURCE_BYTES:
+            raise ImageSourceError("Original image is too large")
+        return data
+
+    url = image_url
+    if not url.startswith(("http://", "https://")):
+        if not settings.IMAGE_ORIGIN_BASE_URL:
+            raise ImageSourceError("Relative image_url and no IMAGE_ORIGIN_BASE_URL configured")
+        url = urljoin(settings.IMAGE_ORIGIN_BASE_URL, url)
+    try:
+        with requests.get(url, timeout=(3.05, 10), stream=True, allow_redirects=False) as response:
+            if response.is_redirect:
+                raise ImageSourceError(
+                    f"Original image redirects ({response.status_code}); use its final URL"
+                )
+            response.raise_for_status()
+            length = response.headers.get("Content-Length")
+            if length and length.isdigit() and int(length) > settings.IMAGE_MAX_SOURCE_BYTES:
+                raise ImageSourceError("Original image is too large")
+            body = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                body += chunk
+                if len(body) > settings.IMAGE_MAX_SOURCE_BYTES:
+                    raise ImageSourceError("Original image is too large")
+            return bytes(body)
+    except requests.RequestException as e:
+        raise ImageSourceError(f"Could not fetch original image: {e}")
+
+
+def render_variant(data: bytes, width: int, fmt: str) -> bytes:
+    """
+    Downscale (never upscale) to at most `width` pixels wide, keeping
+    the aspect ratio. Raises ValueError for undecodable images.
+    """
+    pil_format, _ = FORMATS[fmt]
+    try:
+        with Image.open(BytesIO(data)) as original:
+            image = ImageOps.exif_transpose(original)
+            if image.width > width:
+                image.thumbnail((width, image.height), Image.LANCZOS)
+            if pil_format == "JPEG" and image.mode != "RGB":
+                # JPEG has no alpha; flatten onto white like the site background
+                image = image.convert("RGBA")
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel("A"))
+                image = background
+            out = BytesIO()
+            if pil_format == "JPEG":
+                image.save(out, "JPEG", quality=82, optimize=True, progressive=True)
+            else:
+                image.save(out, "WEBP", quality=80, method=4)
+            return out.getvalue()
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Could not decode image: {e}")
+
+
+def _build(key: str, image_url: str, width: int, fmt: str) -> bytes:
+    data = render_variant(load_source(image_url), width, fmt)
+    variant_cache.put(key, data)
+    return data
+
+
+def get_variant(image_url: str, width: int, fmt: str) -> bytes:
+    """
+    Cached variant bytes, rendering them on the resize pool on a miss.
+    Concurrent requests for the same variant share one render. Raises
+    ResizeTimeout when the render takes over RESIZE_TIMEOUT_SECONDS.
+    """
+    key = variant_key(source_version(image_url), width, fmt)
+    data: Optional[bytes] = variant_cache.get(key)
+    if data is not None:
+        return data
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is None:
+            future = _pool.submit(_build, key, image_url, width, fmt)
+            _inflight[key] = future
+            future.add_done_callback(lambda _: _forget(key))
+    try:
+        return future.result(timeout=RESIZE_TIMEOUT_SECONDS)
+    except FutureTimeout:
+        raise ResizeTimeout(f"Image variant {key} is still rendering")
+
+
+def _forget(key: str) -> None:
+    with _inflight_lock:
+        _inflight.pop(key, None)
@@ -0,0 +1,342 @@
+"""
+Durable background jobs for work that shouldn't hold up a request.
+
+A request handler queues a job with `enqueue` in its own transaction,
+so the job exists exactly when the request's writes commit, and
+returns. Worker threads in each app process (started from the app
+lifespan, or by scripts/run_jobs.py) lease due jobs from the `jobs`
+table in batches and run their registered handler, each in its own
+transaction. A failed job is retried with exponential backoff and
+jitter up to its max_attempts, then kept as "dead". A job whose worker
+dies mid-run is leased again once JOB_VISIBILITY_TIMEOUT_SECONDS pass,
+so handlers must be safe to run more than once.
+"""
+import importlib
+import logging
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import delete, event, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DEAD = "dead"
+
+# Session.info flag: jobs were queued in the open transaction
+_ENQUEUED = "jobs_enqueued"
+
+Handler = Callable[[Session, Dict[str, Any]], None]
+
+
+class Registered(NamedTuple):
+    fn: Handler
+    every: Optional[float]
+    own_transactions: bool
+
+
+class Leased(NamedTuple):
+    id: int
+    kind: str
+    payload: Optional[Dict[str, Any]]
+    attempts: int
+    max_attempts: int
+
+
+# Modules that register handlers; every process running workers loads
+# them all, so no job kind goes unhandled
+HANDLER_MODULES = (
+    "app.services.idempotency",
+    "app.services.notifications",
+    "app.services.payment_events",
+    "app.services.reconciliation",
+)
+
+_handlers: Dict[str, Registered] = {}
+# Set when a transaction that queued jobs commits, so idle workers in
+# this process start at once instead of at their next poll
+_wake = threading.Event()
+
+
+def handler(
+    kind: str, *, every: Optional[float] = None, own_transactions: bool = False
+) -> Callable[[Handler], Handler]:
+    """
+    Register `fn(db, payload)` to run jobs of `kind`. It runs in the
+    transaction that removes the job and must not commit: the worker
+    commits when it returns and rolls back and retries when it raises.
+    With `every` (seconds) the job is periodic: `schedule_periodic`
+    queues the first run and each run queues the next.
+
+    With `own_transactions`, for handlers that call out over the
+    network and so must not hold a transaction open, the job is
+    removed (and its next periodic run queued) before `fn` runs, and
+    `fn` commits its own work. Such a job runs at most once: when it
+    raises, nothing is retried before its next periodic run.
+    """
+    def register(fn: Handler) -> Handler:
+        _handlers[kind] = Registered(fn, every, own_transactions)
+        return fn
+    return register
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    *,
+    delay: float = 0,
+    key: Optional[str] = None,
+    max_attempts: Optional[int] = None,
+) -> None:
+    """
+    Queue a job in the caller's transaction; it runs after `delay`
+    seconds once that transaction commits. With `key`, nothing is
+    queued while another job with that key is pending.
+    """
+    table = Job.__table__
+    now = datetime.now(timezone.utc)
+    values = {
+        "kind": kind,
+        "payload": payload,
+        "key": key,
+        "status": QUEUED,
+        "attempts": 0,
+        "max_attempts": max_attempts or settings.JOB_MAX_ATTEMPTS,
+        "run_at": now + timedelta(seconds=delay),
+        "created_at": now,
+    }
+    dialect = db.get_bind().dialect.name
+    if key is None:
+        db.execute(table.insert().values(**values))
+    elif dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        db.execute(insert(table).values(**values).on_conflict_do_nothing(index_elements=["key"]))
+    elif db.execute(select(table.c.id).where(table.c.key == key)).first() is None:
+        db.execute(table.insert().values(**values))
+    db.info[_ENQUEUED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_workers(session: Session) -> None:
+    if session.info.pop(_ENQUEUED, False):
+        _wake.set()
+
+
+def load_handlers() -> None:
+    for module in HANDLER_MODULES:
+        importlib.import_module(module)
+
+
+def schedule_periodic(db: Session) -> None:
+    """Queue every periodic job that isn't already pending; the caller commits."""
+    load_handlers()
+    for kind, registered in _handlers.items():
+        if registered.every:
+            enqueue(db, kind, key=kind)
+
+
+def claim(db: Session, limit: int) -> List[Leased]:
+    """
+    Lease up to `limit` due jobs, oldest first, and commit. Leased jobs
+    are due again after JOB_VISIBILITY_TIMEOUT_SECONDS unless finished
+    by then. On Postgres SKIP LOCKED hands concurrent workers disjoint
+    batches without waiting on each other.
+    """
+    table = Job.__table__
+    now = datetime.now(timezone.utc)
+    due = (
+        select(table.c.id)
+        .where(table.c.status.in_((QUEUED, RUNNING)), table.c.run_at <= now)
+        .order_by(table.c.run_at, table.c.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    rows = db.execute(
+        table.update()
+        .where(table.c.id.in_(due))
+        .values(
+            status=RUNNING,
+            attempts=table.c.attempts + 1,
+            run_at=now + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS),
+        )
+        .returning(table.c.id, table.c.kind, table.c.payload, table.c.attempts, table.c.max_attempts)
+    ).all()
+    db.commit()
+    return sorted((Leased(*row) for row in rows), key=lambda job: job.id)
+
+
+def backoff(attempts: int) -> float:
+    """Seconds before retry number `attempts`: doubling, capped, with jitter."""
+    delay = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _fail(db: Session, job: Leased, error: str) -> None:
+    """Schedule a retry of a leased job, or bury it once out of attempts."""
+    table = Job.__table__
+    registered = _handlers.get(job.kind)
+    if job.attempts >= job.max_attempts:
+        # Clear the key so the next job with it can be queued
+        values = {"status": DEAD, "key": None}
+        logger.error(f"Job {job.id} ({job.kind}) failed {job.attempts} times, giving up: {error}")
+    else:
+        values = {
+            "status": QUEUED,
+            "run_at": datetime.now(timezone.utc) + timedelta(seconds=backoff(job.attempts)),
+        }
+        logger.warning(f"Job {job.id} ({job.kind}) failed, attempt {job.attempts}: {error}")
+    db.execute(
+        table.update()
+        .where(table.c.id == job.id, table.c.attempts == job.attempts)
+        .values(**values, last_error=error[:2000])
+    )
+    if values["status"] == DEAD and registered and registered.every:
+        # A periodic job carries on at its next run
+        enqueue(db, job.kind, job.payload, delay=registered.every, key=job.kind)
+
+
+def run(job: Leased) -> bool:
+    """Run one leased job in its own session. Returns whether it succeeded."""
+    table = Job.__table__
+    db = SessionLocal()
+    try:
+        if job.attempts > job.max_attempts:
+            # Its last lease ran out without an outcome
+            _fail(db, job, "Lease expired on the last attempt")
+            db.commit()
+            return False
+        # Removing the row first (it only goes if the handler's writes
+        # commit) fences off a worker whose lease on it has expired
+        if not db.execute(
+            delete(table).where(table.c.id == job.id, table.c.attempts == job.attempts)
+        ).rowcount:
+            db.rollback()
+            return False
+        registered = _handlers.get(job.kind)
+        if registered is None:
+            raise LookupError(f"No handler registered for job kind {job.kind!r}")
+        if registered.own_transactions:
+            if registered.every:
+                enqueue(db, job.kind, job.payload, delay=registered.every, key=job.kind)
+            db.commit()
+            try:
+                registered.fn(db, job.payload or {})
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Job {job.id} ({job.kind}) failed: {type(e).__name__}: {e}")
+                return False
+            db.commit()
+            return True
+        registered.fn(db, job.payload or {})
+        if registered.every:
+            enqueue(db, job.kind, job.payload, delay=registered.every, key=job.kind)
+        db.commit()
+        return True
+    except Exception as e:
+        db.rollback()
+        try:
+            _fail(db, job, f"{type(e).__name__}: {e}")
+            db.commit()
+        except Exception as retry_error:
+            # The lease runs out and the job is picked up again
+            db.rollback()
+            logger.error(f"Could not record failure of job {job.id}: {retry_error}")
+        return False
+    finally:
+        db.close()
+
+
+def _release(jobs: Sequence[Leased]) -> None:
+    """Hand leased jobs that never started back to the queue at once."""
+    table = Job.__table__
+    db = SessionLocal()
+    try:
+        for job in jobs:
+            db.execute(
+                table.update()
+                .where(table.c.id == job.id, table.c.attempts == job.attempts)
+                .values(status=QUEUED, attempts=job.attempts - 1, run_at=datetime.now(timezone.utc))
+            )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Could not release {len(jobs)} leased jobs: {e}")
+    finally:
+        db.close()
+
+
+class Worker:
+    """
+    `threads` threads that each lease a batch of due jobs and run them
+    one at a time, sleeping up to `poll_seconds` when the queue is empty.
+    """
+
+    def __init__(self, threads: int, batch_size: int, poll_seconds: float):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._loop, name=f"jobs-{n}", daemon=True) for n in range(threads)
+        ]
+
+    def start(self) -> None:
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float) -> None:
+        """Stop leasing and wait up to `timeout` seconds for running jobs to finish."""
+        self._stop.set()
+        _wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            # Cleared before looking, so a commit during the claim still wakes us
+            _wake.clear()
+            db = SessionLocal()
+            try:
+                batch = claim(db, self.batch_size)
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Job dequeue failed: {e}")
+                batch = []
+            finally:
+                db.close()
+            if not batch:
+                _wake.wait(self.poll_seconds)
+                continue
+            for n, job in enumerate(batch):
+                if self._stop.is_set():
+                    _release(batch[n:])
+                    break
+                run(job)
+
+
+_worker: Optional[Worker] = None
+
+
+def start_workers(threads: int) -> None:
+    global _worker
+    load_handlers()
+    _worker = Worker(threads, settings.JOB_BATCH_SIZE, settings.JOB_POLL_SECONDS)
+    _worker.start()
+
+
+def stop_workers(timeout: float = 10.0) -> None:
+    global _worker
+    if _worker is not None:
+        _worker.stop(timeout)
+        _worker = None
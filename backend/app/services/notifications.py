@@ -0,0 +1,39 @@
+"""
+Customer notifications. They go out from background jobs, so a slow or
+failing provider never holds up (or fails) the request behind them.
+"""
+import logging
+from typing import Any, Dict
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.order import Order
+from app.models.user import User
+from app.services import jobs
+
+logger = logging.getLogger(__name__)
+
+ORDER_CONFIRMATION = "notifications.order_confirmation"
+
+
+def queue_order_confirmation(db: Session, order_id: str) -> None:
+    """Confirm the order to the customer once the caller's transaction commits."""
+    jobs.enqueue(db, ORDER_CONFIRMATION, {"order_id": order_id})
+
+
+@jobs.handler(ORDER_CONFIRMATION)
+def send_order_confirmation(db: Session, payload: Dict[str, Any]) -> None:
+    order = db.execute(
+        select(Order.id, Order.customer_name, Order.phone, Order.total_amount, User.email)
+        .outerjoin(User, User.id == Order.user_id)
+        .where(Order.id == payload["order_id"])
+    ).first()
+    if order is None:
+        logger.warning(f"Order confirmation skipped: order {payload['order_id']} not found")
+        return
+    # No email / SMS provider is configured yet; sending plugs in here
+    logger.info(
+        f"Order confirmation for {order.id} to {order.email or order.phone}: "
+        f"₹{order.total_amount:,.2f}"
+    )
@@ -0,0 +1,305 @@
+import re
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import Row, func, literal_column, select, update
+from sqlalchemy.orm import Session
+
+from app.models.order import RELEASED_STATUSES, Order, OrderItem, OrderStatus
+from app.models.product import Product
+from app.schemas.order import OrderCreate
+from app.services.images import source_version
+from app.services.sales_stats import SalesDeltas
+
+# Keeps the IN list well under every backend's bind-parameter limit
+IN_CHUNK_SIZE = 1000
+
+# Where a bulk update may move an order. Going back (say, reviving a
+# cancelled order) is left to the single-order endpoint.
+ALLOWED_TRANSITIONS: Dict[str, FrozenSet[str]] = {
+    OrderStatus.PENDING.value: frozenset({
+        OrderStatus.PAID.value, OrderStatus.CONFIRMED.value, OrderStatus.SHIPPED.value,
+        OrderStatus.DELIVERED.value, OrderStatus.CANCELLED.value, OrderStatus.FAILED.value,
+    }),
+    OrderStatus.PAID.value: frozenset({
+        OrderStatus.CONFIRMED.value, OrderStatus.SHIPPED.value, OrderStatus.DELIVERED.value,
+        OrderStatus.CANCELLED.value,
+    }),
+    OrderStatus.CONFIRMED.value: frozenset({
+        OrderStatus.SHIPPED.value, OrderStatus.DELIVERED.value, OrderStatus.CANCELLED.value,
+    }),
+    OrderStatus.SHIPPED.value: frozenset({OrderStatus.DELIVERED.value, OrderStatus.CANCELLED.value}),
+    OrderStatus.DELIVERED.value: frozenset(),
+    OrderStatus.CANCELLED.value: frozenset(),
+    OrderStatus.FAILED.value: frozenset(),
+}
+
+
+class ProductNotFound(LookupError):
+    def __init__(self, product_id: str):
+        super().__init__(f"Product {product_id} not found")
+        self.product_id = product_id
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_id: str):
+        super().__init__(f"Product {product_id} is out of stock")
+        self.product_id = product_id
+
+
+def quantities(items: Sequence[Any]) -> Dict[str, int]:
+    """Total quantity per product over order lines (cart or OrderItems)."""
+    totals: Dict[str, int] = defaultdict(int)
+    for item in items:
+        totals[item.product_id] += item.quantity
+    return dict(totals)
+
+
+def reserve_stock(db: Session, wanted: Dict[str, int]) -> Dict[str, str]:
+    """
+    Take stock for every product with one conditional UPDATE each:
+
+        UPDATE products SET stock = stock - :q
+        WHERE id = :id AND stock >= :q AND NOT is_deleted
+
+    The check and the decrement are a single atomic statement that
+    row-locks only that product, so concurrent checkouts cannot
+    oversell. Rows are updated in id order so two carts sharing
+    products always lock them in the same order and cannot deadlock.
+    Raises InsufficientStock; the caller must roll back, which also
+    returns whatever this call had already taken. Returns {id: slug}
+    of the products touched. A quantity below 1 raises ValueError:
+    `stock >= :q` would let it through and add stock.
+    """
+    touched: Dict[str, str] = {}
+    for product_id in sorted(wanted):
+        quantity = wanted[product_id]
+        if quantity <= 0:
+            raise ValueError(f"Quantity for product {product_id} must be positive, got {quantity}")
+        slug = db.execute(
+            update(Product.__table__)
+            .where(
+                Product.id == product_id,
+                Product.stock >= quantity,
+                Product.is_deleted == False,
+            )
+            .values(stock=Product.stock - quantity)
+            .returning(Product.slug)
+        ).scalar_one_or_none()
+        if slug is None:
+            raise InsufficientStock(product_id)
+        touched[product_id] = slug
+    return touched
+
+
+def release_stock(db: Session, held: Dict[str, int]) -> Dict[str, str]:
+    """Give back stock held by a cancelled or failed order. Returns {id: slug}."""
+    touched: Dict[str, str] = {}
+    for product_id in sorted(held):
+        slug = db.execute(
+            update(Product.__table__)
+            .where(Product.id == product_id)
+            .values(stock=Product.stock + held[product_id])
+            .returning(Product.slug)
+        ).scalar_one_or_none()
+        if slug is not None:
+            touched[product_id] = slug
+    return touched
+
+
+def product_snapshot(product: Any) -> Dict[str, Any]:
+    """The OrderItem snapshot columns for a product row."""
+    image_url = product.image_url
+    return {
+        "product_name": product.name,
+        "product_slug": product.slug,
+        "image_url": None if not image_url or image_url.startswith("data:") else image_url,
+        "image_version": source_version(image_url) if image_url else None,
+        "discount_percentage": product.discount_percentage,
+    }
+
+
+def build_order(db: Session, user_id: str, order_in: OrderCreate, **fields: Any) -> Tuple[Order, Dict[str, str]]:
+    """
+    Price the cart, reserve its stock and add the order with its items
+    (each with a product snapshot) to the session, flushed but not
+    committed. All products are read with one IN query and the items go
+    out as one batched INSERT.
+    Extra `fields` are set on the Order. The sales rollups are updated
+    last. Returns the order and the {id: slug} of products whose stock
+    changed, for cache invalidation. Raises ProductNotFound or
+    InsufficientStock; roll back on either.
+    """
+    product_ids = {item.product_id for item in order_in.items}
+    products = {
+        row.id: row
+        for row in db.execute(
+            select(
+                Product.id, Product.price, Product.name, Product.slug,
+                Product.image_url, Product.discount_percentage,
+            ).where(Product.id.in_(product_ids))
+        )
+    }
+    for item in order_in.items:
+        if item.product_id not in products:
+            raise ProductNotFound(item.product_id)
+    touched = reserve_stock(db, quantities(order_in.items))
+
+    order = Order(
+        user_id=user_id,
+        customer_name=order_in.customer_name,
+        phone=order_in.phone,
+        status=OrderStatus.PENDING.value,
+        total_amount=sum(products[item.product_id].price * item.quantity for item in order_in.items),
+        shipping_address=order_in.shipping_address,
+        # Set here rather than by the server default so the sales
+        # rollups can bucket the order without reading it back
+        created_at=datetime.now(timezone.utc),
+        **fields,
+    )
+    order.items = [
+        OrderItem(
+            product_id=item.product_id,
+            quantity=item.quantity,
+            price_at_purchase=products[item.product_id].price,
+            **product_snapshot(products[item.product_id]),
+        )
+        for item in order_in.items
+    ]
+    db.add(order)
+    db.flush()
+    sales = SalesDeltas()
+    sales.add(order, order.items)
+    sales.apply(db)
+    return order, touched
+
+
+class OrderState(NamedTuple):
+    id: str
+    status: str
+    created_at: datetime
+    total_amount: float
+
+
+def bulk_update_status(db: Session, order_ids: Sequence[str], status: str) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """
+    Move up to IN_CHUNK_SIZE orders to `status` with one set-based
+    UPDATE. The orders are read and row-locked first (in id order) to
+    check each against ALLOWED_TRANSITIONS; items are only loaded when
+    the move releases stock. Sales rollups are updated, nothing is
+    committed. Returns one result per distinct id, in request order,
+    and the {id: slug} of products whose stock changed.
+    """
+    ids = list(dict.fromkeys(order_ids))
+    current = {
+        row.id: OrderState(*row)
+        for row in db.execute(
+            select(Order.id, Order.status, Order.created_at, Order.total_amount)
+            .where(Order.id.in_(ids))
+            .order_by(Order.id)
+            .with_for_update()
+        )
+    }
+    results: List[Dict[str, Any]] = []
+    moving: List[OrderState] = []
+    for order_id in ids:
+        order = current.get(order_id)
+        if order is None:
+            results.append({"order_id": order_id, "result": "not_found"})
+            continue
+        if order.status == status:
+            result = "unchanged"
+        elif status in ALLOWED_TRANSITIONS.get(order.status, ()):
+            result = "updated"
+            moving.append(order)
+        else:
+            result = "invalid_transition"
+        results.append({
+            "order_id": order_id,
+            "result": result,
+            "previous_status": order.status,
+            "status": status if result == "updated" else order.status,
+        })
+    if not moving:
+        return results, {}
+
+    moving_ids = [order.id for order in moving]
+    db.execute(update(Order.__table__).where(Order.id.in_(moving_ids)).values(status=status))
+
+    # Items only matter when the orders give their stock back; between
+    # stock-holding states the product rollups don't change
+    items: Dict[str, List[Row]] = defaultdict(list)
+    if status in RELEASED_STATUSES:
+        for item in db.execute(
+            select(OrderItem.order_id, OrderItem.product_id, OrderItem.quantity, OrderItem.price_at_purchase)
+            .where(OrderItem.order_id.in_(moving_ids))
+        ):
+            items[item.order_id].append(item)
+    sales = SalesDeltas()
+    for order in moving:
+        sales.remove(order, items[order.id])
+        sales.add(order._replace(status=status), items[order.id])
+    touched = release_stock(db, quantities([item for lines in items.values() for item in lines]))
+    sales.apply(db)
+    return results, touched
+
+
+def phone_digits(dialect: str):
+    """
+    `orders.phone` with formatting stripped. On Postgres this is the
+    exact expression the trigram index is built on, so it is written
+    with inline literals rather than bound parameters.
+    """
+    if dialect == "postgresql":
+        return func.regexp_replace(
+            Order.phone, literal_column("'[^0-9]'"), literal_column("''"), literal_column("'g'")
+        )
+    digits = Order.phone
+    for char in (" ", "-", "+", "(", ")", "."):
+        digits = func.replace(digits, char, "")
+    return digits
+
+
+def filter_orders(
+    stmt,
+    dialect: str,
+    *,
+    phone: Optional[str] = None,
+    customer_name: Optional[str] = None,
+    status: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """
+    Narrow an orders select for admin search. `phone` matches any run of
+    its digits (so "98765 43210", "+91-9876543210" and "43210" all find
+    the same order) and `customer_name` matches any part of the name,
+    case-insensitively; on Postgres both are served by pg_trgm GIN
+    indexes. `start` is inclusive and `end` exclusive.
+    """
+    if phone:
+        stmt = stmt.where(phone_digits(dialect).contains(re.sub(r"\D", "", phone)))
+    if customer_name:
+        stmt = stmt.where(Order.customer_name.icontains(customer_name, autoescape=True))
+    if status:
+        stmt = stmt.where(Order.status == status)
+    if start:
+        stmt = stmt.where(Order.created_at >= start)
+    if end:
+        stmt = stmt.where(Order.created_at < end)
+    return stmt
+
+
+def with_items(db: Session, orders: Sequence[Row]) -> List[Dict[str, Any]]:
+    """
+    Attach line items to order rows with one IN query per chunk instead
+    of a lazy load per order. Returns dicts shaped like schemas.Order.
+    """
+    ids = [order.id for order in orders]
+    items: Dict[str, List[Row]] = defaultdict(list)
+    for start in range(0, len(ids), IN_CHUNK_SIZE):
+        chunk = ids[start:start + IN_CHUNK_SIZE]
+        for item in db.execute(select(OrderItem.__table__).where(OrderItem.order_id.in_(chunk))):
+            items[item.order_id].append(item)
+    return [{**order._asdict(), "items": items[order.id]} for order in orders]
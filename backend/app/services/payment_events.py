@@ -0,0 +1,194 @@
+"""
+Razorpay webhook inbox. The webhook endpoint only verifies a delivery
+and `record`s it; the periodic `payments.process_events` job applies
+stored events to orders in batches, so a burst of webhooks costs one
+insert each on the request path.
+"""
+import hashlib
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.order import RELEASED_STATUSES, Order, OrderStatus
+from app.models.razorpay_event import RazorpayEvent
+from app.services import jobs, notifications
+from app.services.orders import OrderState, bulk_update_status
+from app.services.sales_stats import SalesDeltas
+
+logger = logging.getLogger(__name__)
+
+PROCESS_EVENTS = "payments.process_events"
+# Both arrive for a successful checkout; whichever comes first wins
+CAPTURE_EVENTS = frozenset({"payment.captured", "order.paid"})
+
+
+def record(db: Session, event_id: Optional[str], body: bytes) -> bool:
+    """
+    Append a verified webhook delivery to the inbox; the caller commits.
+    Redeliveries of a stored event are ignored. Razorpay sends the id in
+    the X-Razorpay-Event-Id header; without one the body's hash stands
+    in. A body that isn't UTF-8 is stored with replacement characters
+    and recorded as malformed when processed, rather than failing the
+    delivery (Razorpay would retry it forever). Returns whether the
+    event is new.
+    """
+    table = RazorpayEvent.__table__
+    values = {
+        "id": event_id or "sha256:" + hashlib.sha256(body).hexdigest(),
+        "body": body.decode("utf-8", errors="replace"),
+        "received_at": datetime.now(timezone.utc),
+    }
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        if db.execute(select(table.c.id).where(table.c.id == values["id"])).first():
+            return False
+        db.execute(table.insert().values(**values))
+        return True
+
+    stmt = insert(table).values(**values).on_conflict_do_nothing(index_elements=["id"])
+    return db.execute(stmt.returning(table.c.id)).first() is not None
+
+
+def apply_captures(db: Session, payments: Dict[str, str]) -> Set[str]:
+    """
+    Record captured payments, {razorpay_order_id: razorpay_payment_id},
+    with one UPDATE. Pending orders become paid and their confirmation
+    is queued; other orders keep their status (a capture for a cancelled
+    order is logged for refund). Orders already captured are left
+    alone. Sales rollups are updated, nothing is committed. Returns the
+    razorpay_order_ids that matched an order.
+    """
+    rows = db.execute(
+        select(
+            Order.id, Order.status, Order.created_at, Order.total_amount,
+            Order.razorpay_order_id, Order.payment_status,
+        )
+        .where(Order.razorpay_order_id.in_(list(payments)))
+        .order_by(Order.id)
+        .with_for_update()
+    ).all()
+    capturing = [row for row in rows if row.payment_status != "captured"]
+    if capturing:
+        db.execute(
+            update(Order.__table__)
+            .where(Order.id.in_([row.id for row in capturing]))
+            .values(
+                status=case(
+                    (Order.status == OrderStatus.PENDING.value, OrderStatus.PAID.value),
+                    else_=Order.status,
+                ),
+                payment_status="captured",
+                razorpay_payment_id=case(
+                    {row.razorpay_order_id: payments[row.razorpay_order_id] for row in capturing},
+                    value=Order.razorpay_order_id,
+                ),
+            )
+        )
+        # Pending and paid both hold stock, so only the order rollups move
+        sales = SalesDeltas()
+        for row in capturing:
+            if row.status == OrderStatus.PENDING.value:
+                order = OrderState(row.id, row.status, row.created_at, row.total_amount)
+                sales.remove(order, ())
+                sales.add(order._replace(status=OrderStatus.PAID.value), ())
+                notifications.queue_order_confirmation(db, row.id)
+            elif row.status in RELEASED_STATUSES:
+                logger.warning(
+                    f"Payment {payments[row.razorpay_order_id]} captured for {row.status} "
+                    f"order {row.id}; it needs a refund"
+                )
+        sales.apply(db)
+    return {row.razorpay_order_id for row in rows}
+
+
+def apply_failures(db: Session, order_ids: List[str]) -> Dict[str, str]:
+    """
+    Record online payments that never completed. Orders whose payment is
+    still pending get payment_status "failed", and the pending ones
+    among them move to failed, giving their stock back (see
+    bulk_update_status); orders that moved on, say cancelled, keep their
+    status. Nothing is committed. Returns the {id: slug} of products
+    whose stock changed.
+    """
+    ids = db.execute(
+        select(Order.id)
+        .where(Order.id.in_(order_ids), Order.payment_status == "pending")
+        .order_by(Order.id)
+        .with_for_update()
+    ).scalars().all()
+    if not ids:
+        return {}
+    db.execute(update(Order.__table__).where(Order.id.in_(ids)).values(payment_status="failed"))
+    _, touched = bulk_update_status(db, ids, OrderStatus.FAILED.value)
+    return touched
+
+
+# Only polled while payments are enabled; a run left queued from before
+# still drains the inbox once, without scheduling another
+@jobs.handler(
+    PROCESS_EVENTS,
+    every=settings.RAZORPAY_EVENT_POLL_SECONDS if settings.PAYMENTS_ENABLED else None,
+)
+def process_events(db: Session, payload: Dict[str, Any]) -> None:
+    """
+    Apply up to RAZORPAY_EVENT_BATCH_SIZE unprocessed events, oldest
+    first, and mark them processed. Events of other types are just
+    marked. A full batch queues another run straight away.
+    """
+    table = RazorpayEvent.__table__
+    events = db.execute(
+        select(table.c.id, table.c.body)
+        .where(table.c.processed_at.is_(None))
+        .order_by(table.c.received_at)
+        .limit(settings.RAZORPAY_EVENT_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not events:
+        return
+
+    captures: Dict[str, str] = {}
+    capture_events: Dict[str, List[str]] = defaultdict(list)
+    errors: Dict[str, str] = {}
+    for event in events:
+        try:
+            data = json.loads(event.body)
+            if data["event"] in CAPTURE_EVENTS:
+                payment = data["payload"]["payment"]["entity"]
+                captures.setdefault(payment["order_id"], payment["id"])
+                capture_events[payment["order_id"]].append(event.id)
+        except (ValueError, KeyError, TypeError) as e:
+            errors[event.id] = f"Malformed event: {type(e).__name__}: {e}"
+    if captures:
+        for razorpay_order_id in set(captures) - apply_captures(db, captures):
+            for event_id in capture_events[razorpay_order_id]:
+                errors[event_id] = f"No order with razorpay_order_id {razorpay_order_id}"
+
+    db.execute(
+        update(table)
+        .where(table.c.id.in_([event.id for event in events]))
+        .values(processed_at=datetime.now(timezone.utc))
+    )
+    for event_id, error in errors.items():
+        logger.warning(f"Razorpay event {event_id} skipped: {error}")
+        db.execute(update(table).where(table.c.id == event_id).values(error=error))
+    if len(events) == settings.RAZORPAY_EVENT_BATCH_SIZE:
+        jobs.enqueue(db, PROCESS_EVENTS)
+
+
+@jobs.handler("payments.purge_events", every=24 * 60 * 60)
+def purge_events(db: Session, payload: Dict[str, Any]) -> int:
+    """Forget processed events older than RAZORPAY_EVENT_RETENTION_DAYS."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.RAZORPAY_EVENT_RETENTION_DAYS)
+    return db.execute(
+        delete(RazorpayEvent).where(RazorpayEvent.processed_at < cutoff)
+    ).rowcount
@@ -0,0 +1,193 @@
+from typing import Any, Dict, IO, Iterator, List, Tuple
+import csv
+import io
+import json
+import time
+
+from pydantic import ValidationError
+from sqlalchemy import or_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.product import Product
+from app.schemas.product import ProductCreate
+from app.services.category_stats import FacetDeltas, facet_of
+
+BATCH_SIZE = 500
+
+Row = Tuple[int, Dict[str, Any]]
+
+
+def iter_rows(stream: IO[bytes], fmt: str) -> Iterator[Row]:
+    """
+    Yield (line number, record) pairs from a CSV or NDJSON byte stream
+    without reading the whole upload into memory. Malformed NDJSON lines
+    come through as records holding only an "__error__" key.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            # Empty cells mean "not provided", not empty strings
+            yield reader.line_num, {k.strip(): v for k, v in record.items() if k and v not in ("", None)}
+        return
+
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, {"__error__": f"Invalid JSON: {e}"}
+            continue
+        if not isinstance(record, dict):
+            yield line_no, {"__error__": "Expected a JSON object"}
+            continue
+        yield line_no, record
+
+
+def _batches(rows: Iterator[Row], size: int) -> Iterator[List[Row]]:
+    batch: List[Row] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _error(report: Dict[str, Any], line: int, key: Any, message: str) -> None:
+    report["errors"].append({"line": line, "slug": key, "error": message})
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in exc.errors()
+    )
+
+
+def import_products(db: Session, rows: Iterator[Row], slugify, batch_size: int = BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Upsert products keyed by slug, one transaction per batch. Rows that
+    fail validation or violate a constraint are reported and skipped;
+    the rest of their batch is still written.
+    """
+    report: Dict[str, Any] = {"processed": 0, "created": 0, "updated": 0, "errors": []}
+    for batch in _batches(rows, batch_size):
+        valid: List[Tuple[int, str, Dict[str, Any]]] = []
+        for line, record in batch:
+            report["processed"] += 1
+            if "__error__" in record:
+                _error(report, line, None, record["__error__"])
+                continue
+            try:
+                product_in = ProductCreate.model_validate(record)
+            except ValidationError as e:
+                _error(report, line, record.get("slug"), _validation_message(e))
+                continue
+            data = product_in.model_dump(exclude_unset=True)
+            slug = data.pop("slug", None) or slugify(product_in.name)
+            valid.append((line, slug, data))
+        if not valid:
+            continue
+
+        try:
+            created, updated = _upsert_batch(db, valid)
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            created, updated = _upsert_rows_individually(db, valid, report)
+        report["created"] += created
+        report["updated"] += updated
+    return report
+
+
+def _upsert_batch(db: Session, valid: List[Tuple[int, str, Dict[str, Any]]]) -> Tuple[int, int]:
+    slugs = {slug for _, slug, _ in valid}
+    existing = {p.slug: p for p in db.query(Product).filter(Product.slug.in_(slugs))}
+    deltas = FacetDeltas()
+    created = updated = 0
+    for _, slug, data in valid:
+        product = existing.get(slug)
+        if product is None:
+            product = Product(slug=slug, **data)
+            db.add(product)
+            existing[slug] = product
+            created += 1
+        else:
+            deltas.remove(facet_of(product))
+            for field, value in data.items():
+                setattr(product, field, value)
+            updated += 1
+        deltas.add(facet_of(product))
+    db.flush()
+    deltas.apply(db)
+    return created, updated
+
+
+def _upsert_rows_individually(db: Session, valid, report: Dict[str, Any]) -> Tuple[int, int]:
+    # Slow path, only taken when a batch hits a constraint error: isolate
+    # the offending rows with a savepoint each.
+    created = updated = 0
+    for line, slug, data in valid:
+        try:
+            with db.begin_nested():
+                c, u = _upsert_batch(db, [(line, slug, data)])
+            created += c
+            updated += u
+        except SQLAlchemyError as e:
+            _error(report, line, slug, str(getattr(e, "orig", e)).strip())
+    db.commit()
+    return created, updated
+
+
+def soft_delete_products(db: Session, rows: Iterator[Row], batch_size: int = BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Soft-delete products by slug (or id), renaming slugs with the same
+    `-deleted-{ts}` suffix delete_product uses. One UPDATE per batch.
+    """
+    report: Dict[str, Any] = {"processed": 0, "deleted": 0, "errors": []}
+    for batch in _batches(rows, batch_size):
+        wanted: Dict[str, int] = {}
+        for line, record in batch:
+            report["processed"] += 1
+            key = record.get("slug") or record.get("id")
+            if "__error__" in record or not key:
+                _error(report, line, key, record.get("__error__", "Missing slug"))
+                continue
+            wanted[str(key)] = line
+
+        if not wanted:
+            continue
+        keys = list(wanted)
+        matches = db.query(
+            Product.id, Product.slug, Product.category, Product.is_featured,
+            Product.is_holiday_special, Product.is_deleted,
+        ).filter(
+            or_(Product.slug.in_(keys), Product.id.in_(keys)),
+            Product.is_deleted == False,
+        ).all()
+        found = {m.slug for m in matches} | {m.id for m in matches}
+        for key, line in wanted.items():
+            if key not in found:
+                _error(report, line, key, "Product not found")
+        if not matches:
+            continue
+
+        deltas = FacetDeltas()
+        for match in matches:
+            deltas.remove(facet_of(match))
+        deltas.apply(db)
+
+        suffix = f"-deleted-{int(time.time())}"
+        report["deleted"] += (
+            db.query(Product)
+            .filter(Product.id.in_([m.id for m in matches]))
+            .update(
+                {Product.is_deleted: True, Product.slug: Product.slug + suffix},
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+    return report
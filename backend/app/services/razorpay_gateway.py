@@ -0,0 +1,188 @@
+"""
+Razorpay API client for the payment endpoints and jobs.
+
+Calls share one keep-alive connection pool and get strict connect /
+read timeouts, so a slow Razorpay holds a worker thread for a bounded
+time. A circuit breaker fails calls fast while Razorpay keeps failing,
+and retries (of transient failures only) come out of a budget that
+grows with successful traffic, so retries can't pile onto an outage.
+Point RAZORPAY_API_BASE_URL at scripts/fake_razorpay.py to test offline.
+"""
+import hashlib
+import hmac
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.config import settings
+
+
+class GatewayError(Exception):
+    """Razorpay refused the request (a 4xx other than 429)."""
+
+
+class GatewayUnavailable(GatewayError):
+    """Razorpay is down, slow or rate limiting us, or the breaker is open; try again later."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive failed calls (counted after
+    their retries) and then rejects calls for `reset_seconds`. After
+    that one trial call is let through: its success closes the breaker,
+    its failure opens it again.
+    """
+
+    def __init__(self, failures: int, reset_seconds: float):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            self._trial = True
+            return True
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            self._trial = False
+            if ok:
+                self._consecutive = 0
+                self._opened_at = None
+                return
+            self._consecutive += 1
+            if self._opened_at is not None or self._consecutive >= self.failures:
+                self._opened_at = time.monotonic()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    @property
+    def available(self) -> bool:
+        """Whether allow() would let a call through now; unlike allow(), it doesn't take the trial."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            return not self._trial and time.monotonic() - self._opened_at >= self.reset_seconds
+
+
+class RetryBudget:
+    """
+    Every call deposits `ratio` of a retry, up to `capacity`, and every
+    retry withdraws a whole one: retries stay around `ratio` of traffic
+    however many calls fail.
+    """
+
+    def __init__(self, ratio: float, capacity: float):
+        self.ratio = ratio
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._tokens = capacity
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class RazorpayGateway:
+    def __init__(self, base_url: str, key_id: str, key_secret: str):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (settings.RAZORPAY_CONNECT_TIMEOUT_SECONDS, settings.RAZORPAY_READ_TIMEOUT_SECONDS)
+        self.breaker = CircuitBreaker(settings.RAZORPAY_BREAKER_FAILURES, settings.RAZORPAY_BREAKER_RESET_SECONDS)
+        self.budget = RetryBudget(settings.RAZORPAY_RETRY_BUDGET, capacity=10)
+        self.session = requests.Session()
+        self.session.auth = (key_id, key_secret)
+        # Retries are ours (below); the adapter only pools connections
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.RAZORPAY_POOL_SIZE, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _call(self, method: str, path: str, **kwargs: Any) -> Any:
+        """
+        Send one API call, retrying transient failures while the budget
+        allows. POSTs are only retried when the request never reached
+        Razorpay (connection errors), since Razorpay can't dedupe them.
+        Every call that gets past the breaker records its outcome, so a
+        half-open trial always settles it.
+        """
+        if not self.breaker.allow():
+            raise GatewayUnavailable("Razorpay is unavailable (circuit open)")
+        self.budget.deposit()
+        ok = False
+        try:
+            attempt = 0
+            while True:
+                try:
+                    response = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+                except requests.ConnectionError as e:
+                    # Includes connect timeouts: nothing was sent
+                    error: Exception = GatewayUnavailable(f"Could not reach Razorpay: {e}")
+                    retryable = True
+                except requests.Timeout as e:
+                    error = GatewayUnavailable(f"Razorpay timed out: {e}")
+                    retryable = method == "GET"
+                except requests.RequestException as e:
+                    # A broken response (truncated body, redirect loop...)
+                    error = GatewayUnavailable(f"Razorpay request failed: {e}")
+                    retryable = method == "GET"
+                else:
+                    if response.status_code == 429 or response.status_code >= 500:
+                        error = GatewayUnavailable(f"Razorpay returned {response.status_code}")
+                        retryable = method == "GET"
+                    elif response.status_code >= 400:
+                        # A 4xx is our request's fault, not Razorpay's health
+                        ok = True
+                        raise GatewayError(f"Razorpay returned {response.status_code}: {response.text[:500]}")
+                    else:
+                        try:
+                            body = response.json()
+                        except ValueError as e:
+                            raise GatewayUnavailable(f"Razorpay sent a malformed response: {e}")
+                        ok = True
+                        return body
+                attempt += 1
+                if not retryable or attempt > settings.RAZORPAY_MAX_RETRIES or not self.budget.withdraw():
+                    raise error
+                time.sleep(0.1 * 2 ** (attempt - 1) * random.uniform(0.5, 1.0))
+        finally:
+            self.breaker.record(ok)
+
+    def create_order(self, amount: int, currency: str, receipt: str) -> Dict[str, Any]:
+        """Create a Razorpay order for `amount` in the smallest unit (paisa), auto-captured."""
+        return self._call(
+            "POST",
+            "/orders",
+            json={"amount": amount, "currency": currency, "receipt": receipt, "payment_capture": 1},
+        )
+
+    def order_payments(self, razorpay_order_id: str) -> List[Dict[str, Any]]:
+        """Payments made against a Razorpay order, in any state."""
+        return self._call("GET", f"/orders/{razorpay_order_id}/payments")["items"]
+
+
+def verify_webhook_signature(body: bytes, signature: str) -> bool:
+    """Check X-Razorpay-Signature: HMAC-SHA256 of the raw body with the webhook secret."""
+    expected = hmac.new(settings.RAZORPAY_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+gateway = RazorpayGateway(settings.RAZORPAY_API_BASE_URL, settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
@@ -0,0 +1,172 @@
+"""
+Payment reconciliation. A checkout whose webhook never arrives (or was
+never sent: the customer closed Checkout) leaves its order pending,
+holding stock. The periodic `payments.reconcile` job pages through
+online orders still pending payment, oldest first, asks Razorpay about
+each batch concurrently over the pooled client, and settles them with
+set-based updates: captured payments mark orders paid, and checkouts
+abandoned for RECONCILE_ABANDON_AFTER_MINUTES fail and give their stock
+back. Orders that never got a Razorpay order (the checkout request died
+between its commit and the Razorpay call) can't be paid and fail
+outright. No transaction is open while Razorpay is called. Progress is
+kept in a checkpoint row committed with each batch's updates, so a pass
+cut short (a deploy, a Razorpay outage) resumes where it stopped.
+scripts/reconcile_payments.py runs a whole pass by hand.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.pagination import datetime_key, decode_cursor, encode_cursor, keyset_after
+from app.models.checkpoint import Checkpoint
+from app.models.order import Order
+from app.services import catalog, jobs
+from app.services.payment_events import apply_captures, apply_failures
+from app.services.razorpay_gateway import GatewayError, GatewayUnavailable, gateway
+
+logger = logging.getLogger(__name__)
+
+RECONCILE = "payments.reconcile"
+# Razorpay payment states that may still end in a capture
+IN_PROGRESS = frozenset({"created", "authorized"})
+
+
+class Reconciled(NamedTuple):
+    checked: int
+    captured: int
+    failed: int
+    # {id: slug} of products whose stock came back
+    touched: Dict[str, str]
+    # Whether the pass is over; otherwise the next batch follows on
+    done: bool
+
+
+def _lock_checkpoint(db: Session, name: str) -> Checkpoint:
+    """Get (creating it if needed) and row-lock the checkpoint `name`."""
+    table = Checkpoint.__table__
+    values = {"name": name, "cursor": None, "updated_at": datetime.now(timezone.utc)}
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        db.execute(insert(table).values(**values).on_conflict_do_nothing(index_elements=["name"]))
+    elif db.get(Checkpoint, name) is None:
+        db.execute(table.insert().values(**values))
+    # Concurrent runs (a manual pass during the job) apply batches in turn
+    return db.execute(
+        select(Checkpoint).where(Checkpoint.name == name).with_for_update()
+    ).scalar_one()
+
+
+def reset(db: Session) -> None:
+    """Start the next batch from the oldest pending order; the caller commits."""
+    _lock_checkpoint(db, RECONCILE).cursor = None
+
+
+def _fetch_payments(orders: List[Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    {razorpay_order_id: payments} for the batch, RECONCILE_CONCURRENCY
+    lookups at a time. An order Razorpay refuses to look up is logged
+    and left out; an outage raises GatewayUnavailable.
+    """
+    def lookup(razorpay_order_id: str) -> Optional[List[Dict[str, Any]]]:
+        try:
+            return gateway.order_payments(razorpay_order_id)
+        except GatewayUnavailable:
+            raise
+        except GatewayError as e:
+            logger.warning(f"Reconciliation could not look up {razorpay_order_id}: {e}")
+            return None
+
+    ids = [order.razorpay_order_id for order in orders]
+    with ThreadPoolExecutor(max_workers=settings.RECONCILE_CONCURRENCY) as pool:
+        found = dict(zip(ids, pool.map(lookup, ids)))
+    return {rzp_id: payments for rzp_id, payments in found.items() if payments is not None}
+
+
+def reconcile_batch(db: Session, batch_size: Optional[int] = None) -> Reconciled:
+    """
+    Settle the next batch of up to `batch_size` (RECONCILE_BATCH_SIZE)
+    orders pending payment and move the checkpoint past them, or back
+    to the start once a short batch ends the pass. Commits: the batch is
+    read and its transaction ended before Razorpay is called, then the
+    checkpoint is locked again and the updates are committed with it,
+    which is what makes a pass resumable. Raises GatewayUnavailable,
+    leaving the checkpoint where it was, when Razorpay can't be reached.
+    """
+    batch_size = batch_size or settings.RECONCILE_BATCH_SIZE
+    start = _lock_checkpoint(db, RECONCILE).cursor
+    now = datetime.now(timezone.utc)
+    abandon_before = now - timedelta(minutes=settings.RECONCILE_ABANDON_AFTER_MINUTES)
+    # Compared in SQL: SQLite hands back naive datetimes
+    abandonable = (Order.created_at < abandon_before).label("abandonable")
+    stmt = (
+        select(Order.id, Order.razorpay_order_id, Order.created_at, abandonable)
+        .where(
+            Order.payment_status == "pending",
+            # Recent checkouts are left to their request and webhooks
+            Order.created_at < now - timedelta(minutes=settings.RECONCILE_MIN_AGE_MINUTES),
+        )
+        .order_by(Order.created_at, Order.id)
+        .limit(batch_size)
+    )
+    if start:
+        created_at, order_id = decode_cursor(start, 2)
+        stmt = stmt.where(
+            keyset_after([Order.created_at, Order.id], [datetime_key(db, created_at), order_id])
+        )
+    orders = db.execute(stmt).all()
+    db.commit()
+
+    # Without a Razorpay order there is nothing the customer could pay
+    failures: List[str] = [order.id for order in orders if order.razorpay_order_id is None]
+    online = [order for order in orders if order.razorpay_order_id is not None]
+    payments = _fetch_payments(online) if online else {}
+    captures: Dict[str, str] = {}
+    for order in online:
+        if order.razorpay_order_id not in payments:
+            continue
+        states = {payment["status"]: payment["id"] for payment in payments[order.razorpay_order_id]}
+        if "captured" in states:
+            captures[order.razorpay_order_id] = states["captured"]
+        elif order.abandonable and not IN_PROGRESS & states.keys():
+            failures.append(order.id)
+
+    checkpoint = _lock_checkpoint(db, RECONCILE)
+    # Both only touch orders still pending, so a concurrent run that
+    # settled some of the same orders meanwhile is harmless
+    if captures:
+        apply_captures(db, captures)
+    touched = apply_failures(db, failures) if failures else {}
+    done = len(orders) < batch_size
+    # Unless a concurrent run moved it meanwhile
+    if checkpoint.cursor == start:
+        checkpoint.cursor = None if done else encode_cursor([orders[-1].created_at, orders[-1].id])
+        checkpoint.updated_at = now
+    db.commit()
+    return Reconciled(len(orders), len(captures), len(failures), touched, done)
+
+
+@jobs.handler(
+    RECONCILE,
+    every=settings.RECONCILE_INTERVAL_SECONDS if settings.PAYMENTS_ENABLED else None,
+    own_transactions=True,
+)
+def reconcile(db: Session, payload: Dict[str, Any]) -> None:
+    """Reconcile one batch; until the pass is done the next runs straight away."""
+    result = reconcile_batch(db)
+    catalog.invalidate_products(result.touched)
+    if result.checked:
+        logger.info(
+            f"Reconciled {result.checked} orders: {result.captured} captured, {result.failed} failed"
+        )
+    if not result.done:
+        jobs.enqueue(db, RECONCILE, key=f"{RECONCILE}.next")
+        db.commit()
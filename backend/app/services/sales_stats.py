@@ -0,0 +1,182 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import delete, desc, func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.counters import increment
+from app.models.order import RELEASED_STATUSES, Order, OrderItem, OrderStatus
+from app.models.product import Product
+from app.models.sales_stats import ProductSalesDaily, SalesDaily
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def local_day(moment: datetime) -> date:
+    """The ANALYTICS_TIMEZONE calendar day of a timestamp (naive = UTC, as SQLite returns it)."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(ZoneInfo(settings.ANALYTICS_TIMEZONE)).date()
+
+
+def today() -> date:
+    return local_day(datetime.now(timezone.utc))
+
+
+class SalesDeltas:
+    """
+    Collects rollup changes from order writes so they can be applied to
+    sales_daily / product_sales_daily in the same transaction, one
+    upsert per touched row. An order counts under its current status,
+    and its items count only while it holds stock.
+
+        sales = SalesDeltas()
+        sales.remove(order, order.items)   # before the change
+        order.status = new_status
+        sales.add(order, order.items)      # after the change
+        sales.apply(db)
+    """
+
+    def __init__(self):
+        self._orders: Dict[Tuple[date, str], List[Any]] = defaultdict(lambda: [0, 0.0])
+        self._products: Dict[Tuple[date, str], List[Any]] = defaultdict(lambda: [0, 0.0])
+
+    def _bump(self, order: Any, items: Sequence[Any], sign: int) -> None:
+        day = local_day(order.created_at)
+        counts = self._orders[(day, order.status)]
+        counts[0] += sign
+        counts[1] += sign * order.total_amount
+        if order.status in RELEASED_STATUSES:
+            return
+        for item in items:
+            counts = self._products[(day, item.product_id)]
+            counts[0] += sign * item.quantity
+            counts[1] += sign * item.quantity * item.price_at_purchase
+
+    def add(self, order: Any, items: Sequence[Any]) -> None:
+        self._bump(order, items, 1)
+
+    def remove(self, order: Any, items: Sequence[Any]) -> None:
+        self._bump(order, items, -1)
+
+    def apply(self, db: Session) -> None:
+        # Sorted so concurrent transactions lock the rows in the same
+        # order; call last before commit, as today's rows are shared by
+        # every checkout
+        for (day, status), (orders, revenue) in sorted(self._orders.items()):
+            if orders or revenue:
+                increment(
+                    db,
+                    SalesDaily,
+                    {"day": day, "status": status},
+                    {"order_count": orders, "revenue": revenue},
+                )
+        for (day, product_id), (units, revenue) in sorted(self._products.items()):
+            if units or revenue:
+                increment(
+                    db,
+                    ProductSalesDaily,
+                    {"day": day, "product_id": product_id},
+                    {"units": units, "revenue": revenue},
+                )
+        self._orders.clear()
+        self._products.clear()
+
+
+def rebuild(db: Session) -> int:
+    """
+    Recompute both rollups from the orders table and commit. Orders are
+    streamed in batches and aggregated in memory, which only grows with
+    days x (statuses + products). On Postgres the rollup tables are
+    locked for the duration, so checkouts wait instead of racing the
+    rebuild. Returns the number of orders counted.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE sales_daily, product_sales_daily IN EXCLUSIVE MODE"))
+    db.execute(delete(SalesDaily))
+    db.execute(delete(ProductSalesDaily))
+
+    sales = SalesDeltas()
+    orders = db.execute(
+        select(Order.id, Order.created_at, Order.status, Order.total_amount)
+        .execution_options(yield_per=BACKFILL_BATCH_SIZE)
+    )
+    counted = 0
+    for batch in orders.partitions():
+        items: Dict[str, List[Any]] = defaultdict(list)
+        for item in db.execute(
+            select(OrderItem.order_id, OrderItem.product_id, OrderItem.quantity, OrderItem.price_at_purchase)
+            .where(OrderItem.order_id.in_([order.id for order in batch]))
+        ):
+            items[item.order_id].append(item)
+        for order in batch:
+            sales.add(order, items[order.id])
+        counted += len(batch)
+    sales.apply(db)
+    db.commit()
+    return counted
+
+
+def sales_summary(db: Session, start: date, end: date, top: int) -> Dict[str, Any]:
+    """
+    Dashboard numbers for the local days start..end (inclusive), shaped
+    like schemas.analytics.SalesSummary. Two statements over the
+    rollups, so the cost grows with the range, not the order count.
+    Revenue, order totals and average order value leave out cancelled
+    and failed orders; orders_by_status covers every status.
+    """
+    by_status = {status.value: 0 for status in OrderStatus}
+    days = {start + timedelta(days=n): [0, 0.0] for n in range((end - start).days + 1)}
+    rows = db.execute(
+        select(SalesDaily.day, SalesDaily.status, SalesDaily.order_count, SalesDaily.revenue)
+        .where(SalesDaily.day >= start, SalesDaily.day <= end)
+    )
+    for row in rows:
+        by_status[row.status] = by_status.get(row.status, 0) + row.order_count
+        if row.status not in RELEASED_STATUSES:
+            days[row.day][0] += row.order_count
+            days[row.day][1] += row.revenue
+
+    units = func.sum(ProductSalesDaily.units).label("units")
+    ranked = (
+        select(ProductSalesDaily.product_id, units, func.sum(ProductSalesDaily.revenue).label("revenue"))
+        .where(ProductSalesDaily.day >= start, ProductSalesDaily.day <= end)
+        .group_by(ProductSalesDaily.product_id)
+        .having(units > 0)
+        .order_by(desc(units), ProductSalesDaily.product_id)
+        .limit(top)
+        .subquery()
+    )
+    top_products = db.execute(
+        select(ranked, Product.name, Product.slug)
+        .outerjoin(Product, Product.id == ranked.c.product_id)
+        .order_by(desc(ranked.c.units), ranked.c.product_id)
+    ).all()
+
+    total_orders = sum(orders for orders, _ in days.values())
+    total_revenue = sum(revenue for _, revenue in days.values())
+    return {
+        "start": start,
+        "end": end,
+        "total_orders": total_orders,
+        "total_revenue": round(total_revenue, 2),
+        "average_order_value": round(total_revenue / total_orders, 2) if total_orders else 0.0,
+        "orders_by_status": by_status,
+        "daily": [
+            {"day": day, "orders": orders, "revenue": round(revenue, 2)}
+            for day, (orders, revenue) in days.items()
+        ],
+        "top_products": [
+            {
+                "product_id": row.product_id,
+                "name": row.name,
+                "slug": row.slug,
+                "units": row.units,
+                "revenue": round(row.revenue, 2),
+            }
+            for row in top_products
+        ],
+    }
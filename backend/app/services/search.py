@@ -0,0 +1,80 @@
+from typing import List
+import re
+
+from sqlalchemy import Row, column, desc, func, literal_column, or_, select, table, text
+from sqlalchemy.orm import Session
+
+from app.models.product import Product
+from app.services.catalog import catalog_updated_at
+
+# Index structures are created by the add_product_search_index migration:
+#   Postgres: generated `products.search_vector` tsvector + GIN index
+#   SQLite:   `products_fts` FTS5 table kept in sync by triggers
+SEARCH_CONFIG = "english"
+
+_products_fts = table("products_fts", column("product_id"))
+
+
+def search_terms(q: str) -> List[str]:
+    """Lowercased word tokens; punctuation never reaches the query parser."""
+    return re.findall(r"\w+", q.lower())[:8]
+
+
+def search_products(db: Session, q: str, skip: int = 0, limit: int = 20) -> List[Row]:
+    """
+    Ranked full-text search over name, description and category.
+    Every term must match; the last term also matches as a prefix so
+    the endpoint works for type-ahead.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return []
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = _postgres_query(terms)
+    elif dialect == "sqlite":
+        stmt = _sqlite_query(terms)
+    else:
+        stmt = _like_query(terms)
+    return db.execute(stmt.offset(skip).limit(limit)).all()
+
+
+def _postgres_query(terms: List[str]):
+    expression = " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+    vector = literal_column("products.search_vector")
+    tsquery = func.to_tsquery(literal_column(f"'{SEARCH_CONFIG}'"), expression)
+    return (
+        select(Product.__table__, catalog_updated_at())
+        .where(Product.is_deleted == False, vector.op("@@")(tsquery))
+        .order_by(desc(func.ts_rank_cd(vector, tsquery)), Product.id)
+    )
+
+
+def _sqlite_query(terms: List[str]):
+    # Quoted phrases keep FTS5 operators (AND, NEAR, -, ...) inert
+    match = " ".join(f'"{t}"' for t in terms[:-1]) + f' "{terms[-1]}"*'
+    return (
+        select(Product.__table__, catalog_updated_at())
+        .join(_products_fts, _products_fts.c.product_id == Product.id)
+        .where(
+            Product.is_deleted == False,
+            text("products_fts MATCH :match").bindparams(match=match.strip()),
+        )
+        # bm25 weights: product_id, name, description, category (lower is better)
+        .order_by(text("bm25(products_fts, 0.0, 10.0, 1.0, 5.0)"), Product.id)
+    )
+
+
+def _like_query(terms: List[str]):
+    stmt = select(Product.__table__, catalog_updated_at()).where(Product.is_deleted == False)
+    for term in terms:
+        pattern = f"%{term}%"
+        stmt = stmt.where(
+            or_(
+                Product.name.ilike(pattern),
+                Product.description.ilike(pattern),
+                Product.category.ilike(pattern),
+            )
+        )
+    return stmt.order_by(Product.name, Product.id)
@@ -0,0 +1,77 @@
+from collections import defaultdict
+from typing import Dict, List
+
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.http_cache import CachedPayload
+from app.core.serialization import dump_json
+from app.models.product import Product
+from app.schemas.storefront import HomePage
+from app.services.catalog import catalog_updated_at, listing_payload
+from app.services.category_stats import list_facets
+
+FEATURED_LIMIT = 12
+HOLIDAY_LIMIT = 8
+CATEGORY_ROW_LIMIT = 8
+
+HOME_KEY = ("home",)
+
+
+def _section(label: str, limit: int, *criteria):
+    # Wrapped in a subquery: SQLite rejects LIMIT on a bare UNION member
+    part = (
+        select(*Product.__table__.c, catalog_updated_at(), literal(label).label("section"))
+        .where(Product.is_deleted == False, *criteria)
+        .order_by(Product.created_at.desc(), Product.id.desc())
+        .limit(limit)
+        .subquery()
+    )
+    return select(part)
+
+
+def build_home(db: Session) -> CachedPayload:
+    """
+    Every home-page section in one payload: featured products, holiday
+    specials and the newest products of each category. Two statements:
+    the category list from category_stats, then one UNION ALL of all
+    the per-section top-N queries.
+    """
+    facets = list_facets(db)
+    sections = [
+        _section("featured", FEATURED_LIMIT, Product.is_featured == True),
+        _section("holiday", HOLIDAY_LIMIT, Product.is_holiday_special == True),
+    ] + [
+        _section("category", CATEGORY_ROW_LIMIT, Product.category == facet.category)
+        for facet in facets
+    ]
+    combined = union_all(*sections).subquery()
+    rows = db.execute(
+        select(combined).order_by(
+            combined.c.section, combined.c.created_at.desc(), combined.c.id.desc()
+        )
+    ).all()
+
+    by_section: Dict[str, List] = defaultdict(list)
+    by_category: Dict[str, List] = defaultdict(list)
+    for row in rows:
+        if row.section == "category":
+            by_category[row.category].append(row)
+        else:
+            by_section[row.section].append(row)
+
+    body = dump_json(HomePage, {
+        "featured": by_section["featured"],
+        "holiday_specials": by_section["holiday"],
+        "categories": [
+            {
+                "category": facet.category,
+                "product_count": facet.product_count,
+                "products": by_category[facet.category],
+            }
+            for facet in facets
+        ],
+    })
+    # Rows repeat across sections; tag each product once
+    unique = list({row.id: row for row in rows}.values())
+    return listing_payload(body, unique, ["home"])
@@ -0,0 +1,37 @@
+"""
+Rebuild the sales analytics rollups (sales_daily, product_sales_daily)
+from the orders table. Run once after the migration that adds them, or
+any time the numbers look off; it replaces the rollups wholesale.
+
+    python scripts/backfill_sales_stats.py
+"""
+import os
+import sys
+import time
+
+# Ensure the current directory is in the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+from app.db.base import Base  # noqa: F401  (configures every mapper)
+from app.db.session import SessionLocal
+from app.services.sales_stats import rebuild
+
+
+def main():
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        counted = rebuild(db)
+        print(f"Rebuilt sales rollups from {counted} orders in {time.perf_counter() - start:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Time the admin order search filters of `GET /orders/` on a large table.
+
+`--seed N` first inserts N synthetic orders (names, phones in mixed
+formats, statuses, two years of timestamps). Each case then runs the
+endpoint's query (filters, newest first, one page, plus its items)
+`--repeat` times and reports p50 / p95 latency and the index the
+planner picked. Run it against a migrated database (`alembic upgrade
+head`) so the search indexes exist; seeding writes a lot, so use a
+scratch one:
+
+    DATABASE_URL=postgresql+psycopg2://... python scripts/bench_order_search.py --seed 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Ensure the current directory is in the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+from sqlalchemy import desc, insert, select, text
+
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.user import User
+from app.services.orders import filter_orders, with_items
+
+FIRST_NAMES = ["Aarav", "Aditi", "Ananya", "Arjun", "Diya", "Ishaan", "Kavya", "Meera", "Neha", "Priya",
+               "Rahul", "Riya", "Rohan", "Saanvi", "Sanjay", "Shreya", "Sunita", "Vikram", "Yash", "Zoya"]
+LAST_NAMES = ["Agarwal", "Bansal", "Chauhan", "Gupta", "Iyer", "Jain", "Kapoor", "Khanna", "Mehta", "Nair",
+              "Patel", "Rao", "Reddy", "Saxena", "Shah", "Sharma", "Singh", "Verma", "Yadav", "Zaveri"]
+PAGE = 20
+CHUNK = 10000
+
+
+def format_phone(rng: random.Random, digits: str) -> str:
+    style = rng.random()
+    if style < 0.5:
+        return digits
+    if style < 0.8:
+        return f"{digits[:5]} {digits[5:]}"
+    return f"+91-{digits}"
+
+
+def seed(count: int):
+    print(f"Seeding {count} orders...")
+    rng = random.Random(7)
+    now = datetime.now(timezone.utc)
+    statuses = [s.value for s in OrderStatus]
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        user_id = str(uuid.uuid4())
+        conn.execute(insert(User), [{"id": user_id, "email": f"{user_id}@example.com", "role": "user"}])
+        for start in range(0, count, CHUNK):
+            orders, items = [], []
+            for i in range(start, min(start + CHUNK, count)):
+                oid = str(uuid.uuid4())
+                orders.append({
+                    "id": oid, "user_id": user_id,
+                    "customer_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}{rng.randint(1, 999)}",
+                    "phone": format_phone(rng, f"{rng.randint(6, 9)}{rng.randint(0, 999999999):09d}"),
+                    "status": rng.choices(statuses, weights=[10, 10, 10, 60, 8, 2])[0],
+                    "total_amount": 1000.0, "created_at": now - timedelta(seconds=i * 60 * 24 * 365 * 2 // count),
+                })
+                items.append({
+                    "id": str(uuid.uuid4()), "order_id": oid, "product_id": None,
+                    "quantity": 1, "price_at_purchase": 1000.0,
+                })
+            conn.execute(insert(Order), orders)
+            conn.execute(insert(OrderItem), items)
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+
+
+def run_query(db, dialect: str, filters: dict):
+    stmt = filter_orders(select(Order.__table__), dialect, **filters)
+    stmt = stmt.order_by(desc(Order.created_at), desc(Order.id)).limit(PAGE)
+    return stmt, with_items(db, db.execute(stmt).all())
+
+
+def plan_summary(db, stmt) -> str:
+    compiled = stmt.compile(dialect=db.get_bind().dialect)
+    if db.get_bind().dialect.name == "postgresql":
+        plan = db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params).scalar()
+        nodes, found = [plan[0]["Plan"]], []
+        while nodes:
+            node = nodes.pop()
+            if "Index Name" in node or node["Node Type"] == "Seq Scan":
+                found.append(node.get("Index Name") or f"Seq Scan on {node['Relation Name']}")
+            nodes.extend(node.get("Plans", []))
+        return ", ".join(found)
+    rows = db.connection().exec_driver_sql(
+        "EXPLAIN QUERY PLAN " + str(compiled), tuple(compiled.params.values())
+    ).fetchall()
+    return "; ".join(row[-1] for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0, metavar="N", help="insert N synthetic orders first")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+
+    db = SessionLocal()
+    try:
+        dialect = db.get_bind().dialect.name
+        total = db.execute(text("SELECT count(*) FROM orders")).scalar()
+        sample = db.execute(
+            select(Order.phone, Order.customer_name, Order.created_at).order_by(Order.id).limit(1)
+        ).one()
+        digits = "".join(c for c in sample.phone if c.isdigit())
+        day = sample.created_at.replace(hour=0, minute=0, second=0, microsecond=0)
+        cases = [
+            ("phone, full number", {"phone": digits}),
+            ("phone, last 5 digits", {"phone": digits[-5:]}),
+            ("phone, formatted", {"phone": f"{digits[:5]} {digits[5:]}"}),
+            ("name, full", {"customer_name": sample.customer_name}),
+            ("name, fragment", {"customer_name": sample.customer_name.split()[-1][:6]}),
+            ("status", {"status": OrderStatus.SHIPPED.value}),
+            ("status + one day", {"status": OrderStatus.DELIVERED.value, "start": day, "end": day + timedelta(days=1)}),
+            ("one week", {"start": day, "end": day + timedelta(days=7)}),
+        ]
+        print(f"{total} orders, {dialect}, page of {PAGE}\n")
+        for label, filters in cases:
+            run_query(db, dialect, filters)  # warm up
+            timings, found = [], 0
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                _, rows = run_query(db, dialect, filters)
+                timings.append(time.perf_counter() - start)
+                found = len(rows)
+            timings.sort()
+            stmt, _ = run_query(db, dialect, filters)
+            print(
+                f"{label:<22} {found:>3} rows  p50 {statistics.median(timings) * 1000:7.2f} ms  "
+                f"p95 {timings[int(len(timings) * 0.95) - 1] * 1000:7.2f} ms  {plan_summary(db, stmt)}"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
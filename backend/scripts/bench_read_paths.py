@@ -0,0 +1,155 @@
+"""
+Compare the ORM and Core read paths of the list endpoints under load.
+
+For each endpoint body (query + serialization, without HTTP), runs
+`--requests` calls from `--concurrency` threads with one session per
+call, and reports latency percentiles, throughput and the peak memory
+allocated by one call. Needs a populated database; `--seed` fills a
+scratch one using the query-plan check's generator:
+
+    DATABASE_URL=postgresql+psycopg2://... python scripts/bench_read_paths.py --seed
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+# Ensure the current directory is in the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+from sqlalchemy import create_engine, desc, select, text
+
+from app.core.config import settings
+from app.core.serialization import dump_json
+from app.db.base import Base  # noqa: F401  (configures every mapper)
+from app.db.session import SessionLocal, engine
+from app.models.address import Address
+from app.models.order import Order
+from app.models.product import Product
+from app.schemas.address import Address as AddressSchema
+from app.schemas.order import Order as OrderSchema
+from app.schemas.product import Product as ProductSchema
+from app.services.catalog import ProductFilters, query_product_page
+from app.services.orders import with_items
+
+LIMIT = 100
+
+
+def orm_products(db, ctx):
+    rows = db.query(Product).filter(Product.is_deleted == False).limit(LIMIT).all()
+    return dump_json(List[ProductSchema], rows)
+
+
+def core_products(db, ctx):
+    return dump_json(List[ProductSchema], query_product_page(db, ProductFilters(), 0, LIMIT))
+
+
+def orm_orders(db, ctx):
+    rows = db.query(Order).order_by(desc(Order.created_at)).limit(LIMIT).all()
+    return dump_json(List[OrderSchema], rows)
+
+
+def core_orders(db, ctx):
+    rows = db.execute(select(Order.__table__).order_by(desc(Order.created_at)).limit(LIMIT)).all()
+    return dump_json(List[OrderSchema], with_items(db, rows))
+
+
+def orm_addresses(db, ctx):
+    rows = db.query(Address).filter(Address.user_id == ctx["user_id"]).limit(LIMIT).all()
+    return dump_json(List[AddressSchema], rows)
+
+
+def core_addresses(db, ctx):
+    stmt = select(Address.__table__).where(Address.user_id == ctx["user_id"]).limit(LIMIT)
+    return dump_json(List[AddressSchema], db.execute(stmt).all())
+
+
+CASES = [
+    ("products", orm_products, core_products),
+    ("orders", orm_orders, core_orders),
+    ("addresses", orm_addresses, core_addresses),
+]
+
+
+def call(fn, ctx) -> float:
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        fn(db, ctx)
+    finally:
+        db.close()
+    return time.perf_counter() - start
+
+
+def peak_memory_per_call(fn, ctx, calls: int = 20) -> float:
+    call(fn, ctx)
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            call(fn, ctx)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        return statistics.median(peaks)
+    finally:
+        tracemalloc.stop()
+
+
+def load(fn, ctx, requests: int, concurrency: int):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pool.submit(call, fn, ctx).result()
+        start = time.perf_counter()
+        latencies = list(pool.map(lambda _: call(fn, ctx), range(requests)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "rps": requests / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="insert a synthetic dataset first")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--pool-size", type=int, default=20, help="DB connections shared by the threads")
+    args = parser.parse_args()
+
+    if args.seed:
+        from check_query_plans import seed
+        seed(products=5000, users=500, orders=20000)
+
+    # Threads queue for connections like requests do in the app; the
+    # wait shows up as latency instead of pool timeouts
+    SessionLocal.configure(bind=create_engine(
+        settings.SQLALCHEMY_DATABASE_URI, pool_size=args.pool_size, max_overflow=0, pool_timeout=600,
+    ))
+    with engine.connect() as conn:
+        ctx = {"user_id": conn.execute(text("SELECT user_id FROM addresses LIMIT 1")).scalar()}
+
+    for label, orm_fn, core_fn in CASES:
+        for path, fn in (("orm", orm_fn), ("core", core_fn)):
+            stats = load(fn, ctx, args.requests, args.concurrency)
+            kib = peak_memory_per_call(fn, ctx) / 1024
+            print(
+                f"{label:<10} {path:<5} p50 {stats['p50']:7.1f} ms  p95 {stats['p95']:7.1f} ms  "
+                f"{stats['rps']:7.1f} req/s  peak {kib:6.0f} KiB/call"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark list-response serialization: FastAPI's default response_model
+path against app.core.serialization.dump_json.
+
+Builds in-memory ORM objects (no database needed), checks that both
+paths produce the same JSON, then times each:
+
+    python scripts/bench_serialization.py --items 1000 --repeat 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+# Ensure the current directory is in the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.serialization import dump_json
+from app.db.base import Base  # noqa: F401  (configures every mapper)
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.schemas.order import Order as OrderSchema
+from app.schemas.product import Product as ProductSchema
+
+
+def make_products(n: int) -> List[Product]:
+    return [
+        Product(
+            id=str(uuid.uuid4()), name=f"Kundan Necklace {i}", slug=f"kundan-necklace-{i}",
+            description="Handcrafted kundan necklace with pearl drops " * 3,
+            price=1000.0 + i, discount_percentage=10.0, effective_price=900.0 + i,
+            stock=i % 20, image_url=f"https://cdn.example.com/p/{i}.jpg", category="necklaces",
+            is_featured=i % 7 == 0, is_holiday_special=i % 11 == 0,
+        )
+        for i in range(n)
+    ]
+
+
+def make_orders(n: int) -> List[Order]:
+    now = datetime.now(timezone.utc)
+    orders = []
+    for i in range(n):
+        order = Order(
+            id=str(uuid.uuid4()), user_id=str(uuid.uuid4()), customer_name=f"Customer {i}",
+            phone="9876543210", payment_method="COD", status="pending", total_amount=2500.0,
+            created_at=now - timedelta(minutes=i),
+            shipping_address={"street": "1 MI Road", "city": "Jaipur", "state": "RJ", "zip": "302001"},
+        )
+        order.items = [
+            OrderItem(id=str(uuid.uuid4()), product_id=str(uuid.uuid4()), quantity=1, price_at_purchase=1250.0)
+            for _ in range(2)
+        ]
+        orders.append(order)
+    return orders
+
+
+def fastapi_path(tp, objects) -> bytes:
+    field = create_response_field(name="Response", type_=tp, mode="serialization")
+    content = asyncio.run(serialize_response(field=field, response_content=objects, is_coroutine=True))
+    return JSONResponse(content).body
+
+
+def fast_path(tp, objects) -> bytes:
+    return dump_json(tp, objects)
+
+
+def bench(fn, tp, objects, repeat: int) -> float:
+    fn(tp, objects)  # warm up (builds validators / adapters)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(tp, objects)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    cases = [
+        ("List[Product]", List[ProductSchema], make_products(args.items)),
+        ("List[Order]", List[OrderSchema], make_orders(args.items)),
+    ]
+    for label, tp, objects in cases:
+        if json.loads(fastapi_path(tp, objects)) != json.loads(fast_path(tp, objects)):
+            print(f"{label}: outputs differ")
+            sys.exit(1)
+        slow = bench(fastapi_path, tp, objects, args.repeat)
+        fast = bench(fast_path, tp, objects, args.repeat)
+        size = len(fast_path(tp, objects))
+        print(
+            f"{label:<14} {args.items} items, {size / 1024:.0f} KiB   "
+            f"response_model: {slow * 1000:7.2f} ms   dump_json: {fast * 1000:7.2f} ms   "
+            f"({slow / fast:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
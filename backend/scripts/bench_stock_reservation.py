@@ -0,0 +1,164 @@
+"""
+Flash-sale check for stock reservation.
+
+Creates one low-stock product, fires `--orders` simultaneous checkouts
+at it from `--concurrency` threads (each buying `--quantity`), then
+verifies there was no oversell: accepted orders times quantity must
+equal the stock taken, and stock never drops below zero. On Postgres
+a monitor samples pg_locks during the run and fails if anything takes
+a table-level lock on products stronger than the RowExclusiveLock every
+UPDATE holds. Writes test rows, so use a scratch database:
+
+    DATABASE_URL=postgresql+psycopg2://... python scripts/bench_stock_reservation.py --stock 50 --orders 500
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure the current directory is in the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.base import Base
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.models.user import User
+from app.schemas.order import OrderCreate
+from app.services.orders import InsufficientStock, build_order
+
+# Table-level modes that would serialize checkouts on products
+BLOCKING_LOCK_MODES = {
+    "ShareLock", "ShareRowExclusiveLock", "ExclusiveLock", "AccessExclusiveLock",
+}
+
+
+def setup(Session, stock: int):
+    db = Session()
+    try:
+        user = User(email=f"flash-sale-{uuid.uuid4()}@example.com")
+        product = Product(name="Flash sale jhumka", slug=f"flash-sale-{uuid.uuid4()}", price=999.0, stock=stock)
+        db.add_all([user, product])
+        db.commit()
+        return user.id, product.id
+    finally:
+        db.close()
+
+
+def checkout(Session, user_id: str, product_id: str, quantity: int) -> str:
+    db = Session()
+    try:
+        order_in = OrderCreate(
+            items=[{"product_id": product_id, "quantity": quantity}],
+            customer_name="Flash Sale", phone="9999999999",
+        )
+        build_order(db, user_id, order_in, payment_method="COD")
+        db.commit()
+        return "ok"
+    except InsufficientStock:
+        db.rollback()
+        return "sold_out"
+    except Exception as e:
+        db.rollback()
+        return f"error: {type(e).__name__}: {e}"
+    finally:
+        db.close()
+
+
+def watch_locks(engine, stop: threading.Event, seen: set):
+    with engine.connect() as conn:
+        while not stop.is_set():
+            rows = conn.execute(text(
+                "SELECT mode FROM pg_locks WHERE locktype = 'relation' "
+                "AND relation = 'products'::regclass AND granted"
+            )).scalars().all()
+            seen.update(rows)
+            conn.rollback()
+            time.sleep(0.002)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stock", type=int, default=50)
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--quantity", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--pool-size", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine(
+        settings.SQLALCHEMY_DATABASE_URI, pool_size=args.pool_size, max_overflow=0, pool_timeout=600,
+    )
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    user_id, product_id = setup(Session, args.stock)
+
+    stop, lock_modes = threading.Event(), set()
+    monitor = None
+    if engine.dialect.name == "postgresql":
+        monitor = threading.Thread(target=watch_locks, args=(engine, stop, lock_modes), daemon=True)
+        monitor.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        outcomes = list(pool.map(
+            lambda _: checkout(Session, user_id, product_id, args.quantity), range(args.orders)
+        ))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    if monitor:
+        monitor.join()
+
+    with Session() as db:
+        final_stock = db.execute(select(Product.stock).where(Product.id == product_id)).scalar_one()
+        sold = db.execute(
+            select(func.coalesce(func.sum(OrderItem.quantity), 0))
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(OrderItem.product_id == product_id)
+        ).scalar_one()
+
+    accepted = outcomes.count("ok")
+    sold_out = outcomes.count("sold_out")
+    errors = [o for o in outcomes if o.startswith("error")]
+    print(f"{args.orders} checkouts in {elapsed:.2f}s ({args.orders / elapsed:.0f}/s), concurrency {args.concurrency}")
+    print(f"accepted {accepted}, sold out {sold_out}, errors {len(errors)}")
+    print(f"stock {args.stock} -> {final_stock}, units sold {sold}")
+    if lock_modes:
+        print(f"table-level lock modes seen on products: {', '.join(sorted(lock_modes))}")
+
+    failed = False
+    if final_stock < 0 or sold != args.stock - final_stock or sold != accepted * args.quantity:
+        print("FAIL: oversold or lost stock")
+        failed = True
+    if accepted != min(args.orders, args.stock // args.quantity):
+        print("FAIL: orders were refused while stock was left")
+        failed = True
+    if lock_modes & BLOCKING_LOCK_MODES:
+        print("FAIL: checkout took a blocking table-level lock")
+        failed = True
+    for error in errors[:5]:
+        print(f"  {error}")
+    if errors:
+        failed = True
+    if failed:
+        sys.exit(1)
+    if monitor:
+        print("OK: no oversell, no table-level locking")
+    else:
+        print(f"OK: no oversell (lock monitor only runs on Postgres; {engine.dialect.name} locks the whole database)")
+
+
+if __name__ == "__main__":
+    main()
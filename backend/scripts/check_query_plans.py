@@ -0,0 +1,259 @@
+"""
+Query-plan regression check.
+
+Calls the read endpoints in-process, captures every SELECT they issue,
+runs EXPLAIN on it and fails if the planner picks a full table scan,
+or if an endpoint issues more SELECTs than its budget (catches N+1
+lazy loading, since the seeded pages hold up to 100 rows).
+Run it against a migrated database (`alembic upgrade head`). Seeding
+writes a large synthetic dataset, so point DATABASE_URL at a scratch
+database:
+
+    DATABASE_URL=postgresql+psycopg2://... python scripts/check_query_plans.py --seed
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Ensure the current directory is in the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+from sqlalchemy import event, insert, text
+
+from app.core.config import settings
+
+settings.PRODUCT_CACHE_WARM_ON_STARTUP = False
+
+from app.core.security import create_access_token
+from app.db.base import Base
+from app.db.session import engine
+from app.models.address import Address
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.models.user import User
+
+CATEGORIES = ["rings", "necklaces", "earrings", "bracelets", "bangles", "anklets"]
+MATERIALS = ["gold", "silver", "rose gold", "kundan", "polki", "pearl", "oxidised", "meenakari",
+             "temple", "antique", "american diamond", "emerald", "ruby", "sapphire", "jadau", "platinum"]
+CHUNK = 5000
+# Summary tables with one row per category / per day and status; reading
+# them whole is the point, or cheaper than an index for the planner
+SMALL_TABLES = {"category_stats", "sales_daily"}
+
+
+def _chunks(rows):
+    for i in range(0, len(rows), CHUNK):
+        yield rows[i:i + CHUNK]
+
+
+def seed(products: int, users: int, orders: int):
+    print(f"Seeding {products} products, {users} users, {orders} orders...")
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        product_ids = [str(uuid.uuid4()) for _ in range(products)]
+        rows = [
+            {
+                "id": pid, "name": f"Product {i}", "slug": f"product-{i}-{pid[:8]}",
+                "description": f"Handcrafted {rng.choice(MATERIALS)} piece with {rng.choice(MATERIALS)} work", "price": rng.randint(100, 20000),
+                "discount_percentage": rng.choice([0, 0, 10, 20]), "stock": rng.randint(0, 50),
+                "category": rng.choice(CATEGORIES), "is_featured": rng.random() < 0.05,
+                "is_holiday_special": rng.random() < 0.05, "is_deleted": rng.random() < 0.02,
+            }
+            for i, pid in enumerate(product_ids)
+        ]
+        for chunk in _chunks(rows):
+            conn.execute(insert(Product), chunk)
+
+        user_ids = [str(uuid.uuid4()) for _ in range(users)]
+        conn.execute(insert(User), [{"email": f"admin-{uuid.uuid4()}@example.com", "role": "admin"}])
+        for chunk in _chunks([{"id": uid, "email": f"{uid}@example.com", "role": "user"} for uid in user_ids]):
+            conn.execute(insert(User), chunk)
+        for chunk in _chunks([
+            {"user_id": uid, "street": "1 Main St", "city": "Jaipur", "state": "RJ", "zip": "302001", "country": "IN"}
+            for uid in user_ids
+        ]):
+            conn.execute(insert(Address), chunk)
+
+        order_rows, item_rows = [], []
+        for i in range(orders):
+            oid = str(uuid.uuid4())
+            order_rows.append({
+                "id": oid, "user_id": rng.choice(user_ids), "customer_name": f"Customer {i}",
+                "phone": f"9{rng.randint(100000000, 999999999)}", "status": "pending",
+                "total_amount": 1000.0, "created_at": now - timedelta(minutes=i),
+            })
+            for _ in range(rng.randint(1, 3)):
+                item_rows.append({
+                    "id": str(uuid.uuid4()), "order_id": oid, "product_id": rng.choice(product_ids),
+                    "quantity": 1, "price_at_purchase": 1000.0,
+                })
+        for chunk in _chunks(order_rows):
+            conn.execute(insert(Order), chunk)
+        for chunk in _chunks(item_rows):
+            conn.execute(insert(OrderItem), chunk)
+
+    from app.db.session import SessionLocal
+    from app.services.sales_stats import rebuild
+
+    with SessionLocal() as db:
+        rebuild(db)
+
+
+def analyze():
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+
+
+def capture_selects(calls):
+    """Run the endpoint calls and return every SELECT they sent to the DB."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services.catalog import product_cache
+
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    with engine.connect() as conn:
+        admin_id = conn.execute(text("SELECT id FROM users WHERE role = 'admin' LIMIT 1")).scalar()
+        user_id = conn.execute(text("SELECT user_id FROM orders LIMIT 1")).scalar()
+    headers = {
+        "admin": {"Authorization": f"Bearer {create_access_token(admin_id)}"} if admin_id else None,
+        "user": {"Authorization": f"Bearer {create_access_token(user_id)}"},
+    }
+
+    results = []
+    client = TestClient(app, raise_server_exceptions=False)
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        for label, who, method, path, budget in calls:
+            if who and headers[who] is None:
+                print(f"  skip {label}: no admin user in database")
+                continue
+            product_cache.clear()
+            captured.clear()
+            response = client.request(method, settings.API_V1_STR + path, headers=headers[who] if who else None)
+            results.append((label, budget, response.status_code, list(captured)))
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return results
+
+
+def _pg_seq_scans(plan, parent=None):
+    # A Seq Scan directly under a Limit (no Sort) stops after a few rows
+    # and is what we want for unordered first pages.
+    node_type = plan.get("Node Type")
+    found = []
+    if node_type == "Seq Scan" and parent != "Limit" and plan.get("Relation Name") not in SMALL_TABLES:
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found += _pg_seq_scans(child, node_type)
+    return found
+
+
+def full_scans(conn, statement, parameters):
+    if engine.dialect.name == "postgresql":
+        plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return _pg_seq_scans(plan[0]["Plan"])
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    # "SCAN <table>" without an index is a full scan; "SEARCH" uses one.
+    # Scans of anon_N are over subquery results, not tables.
+    found = []
+    for row in rows:
+        detail = row[-1]
+        if not detail.startswith("SCAN ") or "INDEX" in detail:
+            continue
+        name = detail.split()[1]
+        if name in SMALL_TABLES or name == "products_fts" or name.startswith("anon_"):
+            continue
+        found.append(name)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="insert a synthetic dataset first")
+    parser.add_argument("--products", type=int, default=50000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--orders", type=int, default=200000)
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.products, args.users, args.orders)
+    analyze()
+
+    with engine.connect() as conn:
+        slug = conn.execute(text("SELECT slug FROM products WHERE is_deleted = false LIMIT 1")).scalar()
+        order_id = conn.execute(text("SELECT id FROM orders LIMIT 1")).scalar()
+    week_ago = (datetime.now(timezone.utc) - timedelta(days=6)).date()
+
+    # (label, caller, method, path, max SELECTs). Authenticated calls
+    # include the SELECT that loads the current user.
+    calls = [
+        ("products: list", None, "GET", "/products/", 1),
+        ("products: by category", None, "GET", "/products/?category=rings", 1),
+        ("products: cursor", None, "GET", "/products/?cursor=", 1),
+        ("products: price range", None, "GET", "/products/?min_price=1000&max_price=1500&sort=price_asc&cursor=", 1),
+        ("products: price desc", None, "GET", "/products/?sort=price_desc&limit=20", 1),
+        ("products: newest", None, "GET", "/products/?sort=newest&cursor=", 1),
+        ("products: search", None, "GET", "/products/search?q=kundan+jadau", 1),
+        ("products: detail", None, "GET", f"/products/{slug}", 2),
+        ("storefront: home", None, "GET", "/storefront/home", 2),
+        ("orders: own", "user", "GET", "/orders/", 3),
+        ("orders: own cursor", "user", "GET", "/orders/?cursor=", 3),
+        ("orders: all", "admin", "GET", "/orders/", 3),
+        ("orders: all cursor", "admin", "GET", "/orders/?cursor=", 3),
+        ("orders: by status", "admin", "GET", "/orders/?status=pending&cursor=", 3),
+        ("orders: by status and week", "admin", "GET", f"/orders/?status=pending&start={week_ago}&cursor=", 3),
+        ("orders: status update", "admin", "PATCH", f"/orders/{order_id}/status?status=pending", 3),
+        ("addresses: own", "user", "GET", "/users/me/addresses", 2),
+        # Ranges well inside the seeded history, so the planner has a reason to use the index
+        ("analytics: last week", "admin", "GET", f"/analytics/sales?start={week_ago}", 3),
+        ("analytics: one day", "admin", "GET", f"/analytics/sales?start={week_ago}&end={week_ago}&top=25", 3),
+    ]
+
+    failures = 0
+    with engine.connect() as conn:
+        for label, budget, status_code, selects in capture_selects(calls):
+            if status_code != 200:
+                failures += 1
+                print(f"FAIL {label}: HTTP {status_code}")
+                continue
+            bad = 0
+            if len(selects) > budget:
+                bad += 1
+                print(f"FAIL {label}: {len(selects)} queries, budget is {budget}")
+            for statement, parameters in selects:
+                scans = full_scans(conn, statement, parameters)
+                if scans:
+                    bad += 1
+                    print(f"FAIL {label}: full scan on {', '.join(scans)}\n    {' '.join(statement.split())[:200]}")
+            if not bad:
+                print(f"ok   {label} ({len(selects)} queries)")
+            failures += bad
+
+    if failures:
+        print(f"\n{failures} check(s) failed: full table scans or query budgets exceeded.")
+        sys.exit(1)
+    print("\nAll endpoint queries use indexes and stay within their query budgets.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+A local stand-in for the parts of the Razorpay API the backend uses
+(create order, list an order's payments), with injectable latency and
+failures, for testing services/razorpay_gateway offline:
+
+    python scripts/fake_razorpay.py --port 9100 --latency 0.2 --error-rate 0.1
+    RAZORPAY_API_BASE_URL=http://127.0.0.1:9100/v1 uvicorn app.main:app
+
+Faults can also be changed while it runs, e.g. to simulate an outage:
+
+    curl -X POST localhost:9100/_faults -d '{"error_rate": 1}'
+
+and payments made, as a customer would in Checkout:
+
+    curl -X POST localhost:9100/_pay/order_XXXX -d '{"status": "captured"}'
+
+State is in memory and lost on exit.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+lock = threading.Lock()
+orders = {}
+payments = {}  # razorpay order id -> [payment]
+faults = {"latency": 0.0, "jitter": 0.0, "error_rate": 0.0, "timeout_rate": 0.0, "hang_seconds": 30.0}
+
+
+def new_id(prefix: str) -> str:
+    return f"{prefix}_{uuid.uuid4().hex[:14]}"
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _inject(self) -> bool:
+        """Apply latency / failure faults to an API call; True if it already answered."""
+        if random.random() < faults["timeout_rate"]:
+            time.sleep(faults["hang_seconds"])
+        time.sleep(max(0.0, faults["latency"] + random.uniform(-1, 1) * faults["jitter"]))
+        if random.random() < faults["error_rate"]:
+            self._send(500, {"error": {"code": "SERVER_ERROR", "description": "Injected failure"}})
+            return True
+        if not self.headers.get("Authorization", "").startswith("Basic "):
+            self._send(401, {"error": {"code": "BAD_REQUEST_ERROR", "description": "Authentication failed"}})
+            return True
+        return False
+
+    def do_POST(self):
+        body = self._body()
+        if self.path == "/_faults":
+            with lock:
+                faults.update({k: float(v) for k, v in body.items() if k in faults})
+            return self._send(200, faults)
+        match = re.fullmatch(r"/_pay/([\w-]+)", self.path)
+        if match:
+            with lock:
+                order = orders.get(match.group(1))
+                if order is None:
+                    return self._send(404, {"error": {"code": "BAD_REQUEST_ERROR", "description": "No such order"}})
+                payment = {
+                    "id": new_id("pay"), "entity": "payment", "order_id": order["id"],
+                    "amount": order["amount"], "currency": order["currency"],
+                    "status": body.get("status", "captured"), "created_at": int(time.time()),
+                }
+                payments.setdefault(order["id"], []).append(payment)
+                if payment["status"] == "captured":
+                    order.update(status="paid", amount_paid=order["amount"], amount_due=0)
+                order["attempts"] += 1
+            return self._send(200, payment)
+        if self.path == "/v1/orders":
+            if self._inject():
+                return
+            amount = body.get("amount")
+            if not isinstance(amount, int) or amount < 100:
+                return self._send(400, {"error": {"code": "BAD_REQUEST_ERROR", "description": "amount must be at least 100"}})
+            order = {
+                "id": new_id("order"), "entity": "order", "amount": amount, "amount_paid": 0,
+                "amount_due": amount, "currency": body.get("currency", "INR"), "receipt": body.get("receipt"),
+                "status": "created", "attempts": 0, "created_at": int(time.time()),
+            }
+            with lock:
+                orders[order["id"]] = order
+            return self._send(200, order)
+        self._send(404, {"error": {"code": "BAD_REQUEST_ERROR", "description": "Not found"}})
+
+    def do_GET(self):
+        match = re.fullmatch(r"/v1/orders/([\w-]+)(/payments)?", self.path)
+        if not match:
+            return self._send(404, {"error": {"code": "BAD_REQUEST_ERROR", "description": "Not found"}})
+        if self._inject():
+            return
+        with lock:
+            order = orders.get(match.group(1))
+            if order is None:
+                return self._send(400, {"error": {"code": "BAD_REQUEST_ERROR", "description": "The id provided does not exist"}})
+            if match.group(2):
+                items = list(payments.get(order["id"], []))
+                return self._send(200, {"entity": "collection", "count": len(items), "items": items})
+            return self._send(200, order)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every API call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of API calls answered with a 500")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="share of API calls that hang")
+    parser.add_argument("--hang-seconds", type=float, default=30.0)
+    args = parser.parse_args()
+    faults.update(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate, hang_seconds=args.hang_seconds,
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), Handler)
+    print(f"Fake Razorpay on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Run a payment reconciliation pass by hand (the payments.reconcile job
+does the same a batch at a time): settle every online order still
+pending payment against Razorpay. Each batch commits with its
+checkpoint, so an interrupted pass continues from where it stopped
+when run again; --restart starts from the oldest pending order.
+
+    python scripts/reconcile_payments.py --batch-size 200
+"""
+import argparse
+import os
+import sys
+import time
+
+# Ensure the current directory is in the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+from app.core.config import settings
+from app.db.base import Base  # noqa: F401  (configures every mapper)
+from app.db.session import SessionLocal
+from app.services import reconciliation
+from app.services.razorpay_gateway import GatewayUnavailable
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=settings.RECONCILE_BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start over")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.restart:
+            reconciliation.reset(db)
+            db.commit()
+        start = time.perf_counter()
+        checked = captured = failed = 0
+        while True:
+            try:
+                result = reconciliation.reconcile_batch(db, args.batch_size)
+            except GatewayUnavailable as e:
+                db.rollback()
+                sys.exit(f"Stopped, Razorpay is unavailable ({e}); run again to continue")
+            checked += result.checked
+            captured += result.captured
+            failed += result.failed
+            print(f"Checked {checked} orders: {captured} captured, {failed} failed")
+            if result.done:
+                break
+        print(f"Pass complete in {time.perf_counter() - start:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Run background job workers in their own process, for deployments that
+set JOB_WORKERS=0 on the web processes. Stops on Ctrl-C / SIGTERM,
+letting running jobs finish.
+
+    python scripts/run_jobs.py --threads 4
+"""
+import argparse
+import logging
+import os
+import signal
+import sys
+import threading
+
+# Ensure the current directory is in the python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+from app.core.config import settings
+from app.db.base import Base  # noqa: F401  (configures every mapper)
+from app.db.session import SessionLocal
+from app.services import jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=max(settings.JOB_WORKERS, 1))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    db = SessionLocal()
+    try:
+        jobs.schedule_periodic(db)
+        db.commit()
+    finally:
+        db.close()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    jobs.start_workers(args.threads)
+    print(f"Running {args.threads} job worker threads")
+    try:
+        stop.wait()
+    except KeyboardInterrupt:
+        pass
+    jobs.stop_workers(timeout=settings.JOB_VISIBILITY_TIMEOUT_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 'use client';
 
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import Link from 'next/link';
 import { useRouter } from 'next/navigation';
 import { ArrowLeft, ShieldCheck, Truck, Home } from 'lucide-react';
@@ -28,6 +28,9 @@ export default function CheckoutPage() {
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState('');
     const [lastOrderAmount, setLastOrderAmount] = useState(0);
+    // One key per order attempt, reused when a request is retried after a
+    // network error so the server never places the same order twice
+    const idempotencyKey = useRef<string | null>(null);
 
     // Address Selection State
     const [savedAddresses, setSavedAddresses] = useState<SavedAddress[]>([]);
@@ -157,11 +160,16 @@ export default function CheckoutPage() {
                 }
             }
 
+            if (!idempotencyKey.current) {
+                idempotencyKey.current = crypto.randomUUID();
+            }
             await axios.post(`${API_URL}/orders/`, orderData, {
                 headers: {
-                    Authorization: `Bearer ${localStorage.getItem('token')}`
+                    Authorization: `Bearer ${localStorage.getItem('token')}`,
+                    'Idempotency-Key': idempotencyKey.current
                 }
             });
+            idempotencyKey.current = null;
 
             setLastOrderAmount(subtotal);
             clearCart();
@@ -170,6 +178,11 @@ export default function CheckoutPage() {
 
         } catch (error: any) {
             console.error("Order Placement Error:", error);
+            // The server answered, so the order was not placed: the next
+            // attempt may carry a different cart and needs a new key
+            if (error.response) {
+                idempotencyKey.current = null;
+            }
             setError("Failed to place order. Please try again.");
         } finally {
             setLoading(false);
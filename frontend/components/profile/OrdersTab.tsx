@@ -8,6 +8,7 @@ interface OrderItem {
     product_id: string;
     quantity: number;
     price_at_purchase: number;
+    product_name?: string | null;
 }
 
 interface Order {
@@ -88,6 +89,16 @@ export default function OrdersTab() {
                                     <span className="text-sm font-medium capitalize text-stone-700">{order.status}</span>
                                 </div>
                             </div>
+                            {order.items.some((item) => item.product_name) && (
+                                <ul className="mb-3 space-y-1 text-sm text-stone-700">
+                                    {order.items.map((item, index) => (
+                                        <li key={index} className="flex justify-between">
+                                            <span>{item.product_name ?? 'Item'} × {item.quantity}</span>
+                                            <span>₹{(item.price_at_purchase * item.quantity).toLocaleString('en-IN')}</span>
+                                        </li>
+                                    ))}
+                                </ul>
+                            )}
                             <div className="flex items-center justify-between text-sm text-stone-500">
                                 <span>{order.items.length} Item(s)</span>
                                 <span>{order.payment_method}</span>